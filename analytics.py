@@ -0,0 +1,559 @@
+"""
+Analytics dạng cột (NumPy) cho thống kê giá.
+
+Nạp các cột khóa của một bảng (tên đã chuẩn hóa, giá/số lượng đã ép kiểu,
+ngày, nhóm) vào mảng NumPy, mã hóa category cho cột chữ, rồi tính
+min/max/mean/median/percentile theo nhóm bằng phép toán vector hóa.
+Bản nạp được làm mới khi DatabaseManager.get_data_version() đổi.
+
+NumPy là tùy chọn: không có thì AnalyticsEngine.available() = False và
+app dùng lại đường SQL cũ.
+"""
+
+import threading
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # NumPy không bắt buộc
+    np = None
+
+# Cột chữ được mã hóa category (theo bảng); thứ tự không quan trọng
+KEY_COLUMNS = {
+    "thuoc_generic": ["ten_thuoc", "ten_hoat_chat", "nong_do_ham_luong", "dang_bao_che",
+                      "duong_dung", "don_vi_tinh", "nhom_thuoc"],
+    "thuoc_biet_duoc": ["ten_thuoc", "ten_hoat_chat", "nong_do_ham_luong", "dang_bao_che",
+                        "duong_dung", "don_vi_tinh", "nhom_thuoc"],
+    "thuoc_duoc_lieu": ["ten_thuoc", "ten_hoat_chat", "nong_do_ham_luong", "dang_bao_che",
+                        "duong_dung", "don_vi_tinh", "nhom_thuoc"],
+    "duoc_lieu": ["ten_duoc_lieu", "bo_phan_dung", "don_vi_tinh", "nhom_tckt"],
+    "vi_thuoc": ["ten_vi_thuoc", "bo_phan_dung", "don_vi_tinh", "nhom_tckt"],
+    "bhxh": ["ten_thuoc", "hoat_chat", "ham_luong", "dang_bao_che", "duong_dung",
+             "don_vi_tinh", "nhom_tckt", "ma_tinh"],
+}
+
+DEFAULT_PERCENTILES = (25, 75)
+
+# Phân bố giá: số cột histogram, hệ số Tukey cho ngưỡng ngoại lai,
+# số giá ngoại lai tối đa trả về (số đếm vẫn đầy đủ)
+DEFAULT_BINS = 10
+IQR_FACTOR = 1.5
+MAX_OUTLIER_VALUES = 50
+
+
+def normalize_key(value) -> str:
+    """Khóa so khớp chính xác: bỏ khoảng trắng đầu/cuối + chữ thường
+    (giống LOWER(TRIM()) trong get_price_statistics)."""
+    if value is None:
+        return ""
+    return str(value).strip().lower()
+
+
+def date_key(value: Optional[str]) -> Optional[int]:
+    """'dd/mm/yyyy' hoặc 'yyyy-mm-dd' -> yyyymmdd (int). None nếu không hợp lệ."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        if "/" in value:
+            d, m, y = value.split("/")
+        else:
+            y, m, d = value.split("-")
+        return int(y) * 10000 + int(m) * 100 + int(d)
+    except ValueError:
+        return None
+
+
+def _percentile(sorted_values: Sequence[float], q: float) -> float:
+    """Percentile nội suy tuyến tính (cùng công thức _segment_percentile)."""
+    pos = (len(sorted_values) - 1) * (q / 100.0)
+    lo = int(pos)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (pos - lo)
+
+
+def price_distribution(sorted_prices: Sequence[float], reference: Optional[float] = None,
+                       bins: int = DEFAULT_BINS) -> dict:
+    """Phân bố của một dãy giá đã sắp tăng dần.
+
+    Returns: dict gồm count/min/max/mean/median/p25/p75, iqr, lower_fence/
+    upper_fence (Q1 - 1.5*IQR, Q3 + 1.5*IQR), outliers_low/outliers_high
+    (số giá ngoài ngưỡng), outliers (tối đa MAX_OUTLIER_VALUES giá),
+    histogram {'edges', 'counts'} và - nếu có giá tham khảo -
+    reference_percentile (% giá <= giá tham khảo) + reference_flag
+    ('low' | 'normal' | 'high').
+    """
+    from bisect import bisect_left, bisect_right
+
+    n = len(sorted_prices)
+    result = {"count": n, "reference": reference,
+              "reference_percentile": None, "reference_flag": None}
+    if not n:
+        result.update(_empty_stats(DEFAULT_PERCENTILES))
+        result.update(iqr=0, lower_fence=0, upper_fence=0, outliers_low=0,
+                      outliers_high=0, outliers=[], histogram={"edges": [], "counts": []})
+        return result
+
+    p25 = _percentile(sorted_prices, 25)
+    p75 = _percentile(sorted_prices, 75)
+    iqr = p75 - p25
+    lower_fence = p25 - IQR_FACTOR * iqr
+    upper_fence = p75 + IQR_FACTOR * iqr
+    n_low = bisect_left(sorted_prices, lower_fence)
+    n_high = n - bisect_right(sorted_prices, upper_fence)
+    outliers = list(sorted_prices[:n_low]) + list(sorted_prices[n - n_high:])
+
+    low, high = sorted_prices[0], sorted_prices[-1]
+    bins = max(1, bins if high > low else 1)
+    width = (high - low) / bins or 1
+    edges = [low + width * i for i in range(bins)] + [high]
+    # Số giá trong từng cột = hiệu vị trí các mép trên dãy đã sắp (cột cuối gồm cả max)
+    cuts = [bisect_left(sorted_prices, edge) for edge in edges[1:-1]]
+    bounds = [0] + cuts + [n]
+    counts = [bounds[i + 1] - bounds[i] for i in range(bins)]
+
+    result.update(
+        min=low, max=high, mean=sum(sorted_prices) / n,
+        median=_percentile(sorted_prices, 50), p25=p25, p75=p75,
+        iqr=iqr, lower_fence=lower_fence, upper_fence=upper_fence,
+        outliers_low=n_low, outliers_high=n_high,
+        outliers=outliers[:MAX_OUTLIER_VALUES],
+        histogram={"edges": edges, "counts": counts},
+    )
+    if reference:
+        result["reference_percentile"] = 100.0 * bisect_right(sorted_prices, reference) / n
+        if reference < lower_fence:
+            result["reference_flag"] = "low"
+        elif reference > upper_fence:
+            result["reference_flag"] = "high"
+        else:
+            result["reference_flag"] = "normal"
+    return result
+
+
+class ColumnarTable:
+    """Bản chụp dạng cột của một bảng tại một data version.
+
+    id và giá nạp ngay; số lượng, ngày và cột category nạp khi cần lần đầu
+    (mỗi cột đọc qua index riêng của nó, không quét cả dòng).
+    """
+
+    def __init__(self, db, table_name: str, version: int):
+        from database import TABLE_SCHEMAS, date_column, price_column, sort_key_column
+
+        self.db = db
+        self.table_name = table_name
+        self.version = version
+        self._columns = {col_name for col_name, _ in TABLE_SCHEMAS.get(table_name, [])}
+        self._price_key = sort_key_column(price_column(table_name))
+        self._date_key = sort_key_column(date_column(table_name))
+        self._arrays: Dict[str, "np.ndarray"] = {}
+        self._categories: Dict[str, List[str]] = {}
+        self._lookup: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+        conn = db._get_connection()
+        try:
+            n = conn.execute(f"SELECT COUNT(*) FROM {table_name}").fetchone()[0]
+            self.ids = np.fromiter(  # int64, tăng dần (theo rowid)
+                (row[0] for row in conn.execute(f"SELECT id FROM {table_name} ORDER BY id")),
+                dtype=np.int64, count=n
+            )
+            # float64, NaN = không có giá
+            self.price = self._read_column(conn, self._price_key, np.float64,
+                                           float("nan"), self._price_key)
+        finally:
+            conn.close()
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _read_column(self, conn, expr: str, dtype, missing, order_by: str = ""):
+        """Đọc (id, expr) theo index của cột rồi đặt giá trị về đúng vị trí theo id."""
+        order_sql = f" ORDER BY {order_by}" if order_by else ""
+        pairs = np.fromiter(
+            conn.execute(
+                f"SELECT id, IFNULL({expr}, ?) FROM {self.table_name}{order_sql}", (missing,)
+            ),
+            dtype=np.dtype([("id", np.int64), ("value", dtype)]), count=len(self.ids)
+        )
+        values = np.empty(len(self.ids), dtype=dtype)
+        values[np.searchsorted(self.ids, pairs["id"])] = pairs["value"]
+        return values
+
+    def _lazy(self, name: str, load):
+        with self._lock:
+            if name not in self._arrays:
+                conn = self.db._get_connection()
+                try:
+                    self._arrays[name] = load(conn)
+                finally:
+                    conn.close()
+            return self._arrays[name]
+
+    @property
+    def quantity(self):
+        """float64, NaN = không có số lượng."""
+        return self._lazy("quantity", lambda conn: self._read_column(
+            conn, "so_luong_num", np.float64, float("nan"), "so_luong_num"
+        ))
+
+    @property
+    def amount(self):
+        """float64 thành tiền của dòng: thanh_tien (BHXH) nếu có, ngược lại
+        giá x số lượng; NaN nếu thiếu giá hoặc số lượng."""
+        def load(conn):
+            amount = self.price * self.quantity
+            if "thanh_tien" in self._columns:
+                recorded = self._read_column(conn, "thanh_tien_num", np.float64,
+                                             float("nan"), "thanh_tien_num")
+                amount = np.where(np.isnan(recorded), amount, recorded)
+            return amount
+        return self._lazy("amount", load)
+
+    def weights(self):
+        """(số lượng, thành tiền) dùng cho giá BQ gia quyền: 0 ở dòng không có
+        số lượng > 0 (giống _weighted_sql của DatabaseManager)."""
+        quantity = self.quantity
+        valid = quantity > 0  # NaN -> False
+        return np.where(valid, quantity, 0.0), np.where(valid, self.amount, 0.0)
+
+    @property
+    def dates(self):
+        """int32 yyyymmdd, 0 = không có ngày."""
+        return self._lazy("dates", lambda conn: self._read_column(
+            conn, f"CAST(REPLACE({self._date_key}, '-', '') AS INTEGER)", np.int32, 0,
+            self._date_key
+        ))
+
+    def has_codes(self, column: str) -> bool:
+        return column in KEY_COLUMNS.get(self.table_name, [])
+
+    def codes(self, column: str):
+        """int32: chỉ số của từng dòng trong categories(column)."""
+        return self._lazy(f"codes:{column}", lambda conn: self._encode(conn, column))
+
+    def categories(self, column: str) -> List[str]:
+        """Các khóa đã chuẩn hóa của cột (đã sắp xếp)."""
+        self.codes(column)
+        return self._categories[column]
+
+    def code_of(self, column: str, value) -> int:
+        """Mã category của giá trị (-1 nếu không có trong bảng)."""
+        self.codes(column)
+        return self._lookup[column].get(normalize_key(value), -1)
+
+    def _encode(self, conn, column: str):
+        # DENSE_RANK chạy trên covering index của cột -> mã theo thứ tự giá trị thô
+        raw_codes = self._read_column(conn, f"DENSE_RANK() OVER (ORDER BY {column}) - 1",
+                                      np.int32, 0)
+        raw_values = [row[0] for row in conn.execute(
+            f"SELECT DISTINCT {column} FROM {self.table_name} ORDER BY {column}"
+        )]
+        # Gộp các giá trị thô cùng khóa chuẩn hóa ('Paracetamol ' = 'paracetamol')
+        if raw_values:
+            normalized = np.array([normalize_key(v) for v in raw_values], dtype=object)
+            uniques, remap = np.unique(normalized, return_inverse=True)
+            codes = remap.reshape(-1).astype(np.int32)[raw_codes]
+            categories = list(uniques)
+        else:
+            codes, categories = raw_codes, []
+        self._categories[column] = categories
+        self._lookup[column] = {v: i for i, v in enumerate(categories)}
+        return codes
+
+
+class AnalyticsEngine:
+    """Thống kê giá vector hóa trên bản chụp dạng cột của từng bảng."""
+
+    def __init__(self, db):
+        self.db = db
+        self._tables: Dict[str, ColumnarTable] = {}
+        self._warming: set = set()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def available() -> bool:
+        return np is not None
+
+    # ------------------------------------------------------------------
+    # Nạp dữ liệu
+    # ------------------------------------------------------------------
+    def table(self, table_name: str) -> ColumnarTable:
+        """Bản chụp của bảng, nạp lại nếu data version đã đổi."""
+        version = self.db.get_data_version(table_name)
+        with self._lock:
+            cached = self._tables.get(table_name)
+            if cached is not None and cached.version == version:
+                return cached
+            snapshot = ColumnarTable(self.db, table_name, version)
+            self._tables[table_name] = snapshot
+            return snapshot
+
+    def is_ready(self, table_name: str) -> bool:
+        """Bản chụp của bảng đã nạp và còn đúng phiên bản dữ liệu."""
+        cached = self._tables.get(table_name)
+        return cached is not None and cached.version == self.db.get_data_version(table_name)
+
+    def warm_up(self, table_name: str) -> Optional[threading.Thread]:
+        """Nạp bản chụp ở luồng nền (UI dùng khi bảng lớn).
+        Returns: None nếu bảng đang được nạp."""
+        with self._lock:
+            if table_name in self._warming:
+                return None
+            self._warming.add(table_name)
+
+        def run():
+            try:
+                self.table(table_name)
+            finally:
+                with self._lock:
+                    self._warming.discard(table_name)
+
+        thread = threading.Thread(target=run, name=f"analytics-{table_name}", daemon=True)
+        thread.start()
+        return thread
+
+    def invalidate(self, table_name: Optional[str] = None):
+        with self._lock:
+            if table_name is None:
+                self._tables.clear()
+            else:
+                self._tables.pop(table_name, None)
+
+    # ------------------------------------------------------------------
+    # Lọc
+    # ------------------------------------------------------------------
+    def _mask(self, snap: ColumnarTable, criteria: Optional[dict] = None,
+              ids: Optional[Iterable[int]] = None,
+              date_range: Optional[Tuple[Optional[str], Optional[str]]] = None):
+        """Mask các dòng thỏa tiêu chí và có giá."""
+        mask = ~np.isnan(snap.price)
+        for col, value in (criteria or {}).items():
+            if not value or not snap.has_codes(col):
+                continue
+            code = snap.code_of(col, value)
+            if code < 0:
+                return np.zeros(len(snap), dtype=bool)
+            mask &= snap.codes(col) == code
+        if date_range:
+            start, end = (date_key(d) for d in date_range)
+            if start:
+                mask &= snap.dates >= start
+            if end:
+                mask &= (snap.dates <= end) & (snap.dates > 0)
+        if ids is not None:
+            wanted = np.unique(np.fromiter(ids, dtype=np.int64))
+            mask &= np.isin(snap.ids, wanted, assume_unique=True)
+        return mask
+
+    # ------------------------------------------------------------------
+    # Thống kê
+    # ------------------------------------------------------------------
+    def summary(self, table_name: str, criteria: Optional[dict] = None,
+                ids: Optional[Iterable[int]] = None,
+                date_range: Optional[Tuple[Optional[str], Optional[str]]] = None,
+                percentiles: Sequence[float] = DEFAULT_PERCENTILES) -> dict:
+        """Thống kê giá trên các dòng thỏa tiêu chí.
+
+        criteria: {cột: giá trị} so khớp chính xác (không phân biệt hoa thường)
+        ids: chỉ tính trên các id này (vd. kết quả search_ids)
+        date_range: (từ, đến) dạng dd/mm/yyyy
+        Returns: {'count', 'min', 'max', 'mean', 'median', 'p25', 'p75', ...,
+        'volume', 'weighted_mean'}
+        """
+        snap = self.table(table_name)
+        mask = self._mask(snap, criteria, ids, date_range)
+        quantity, amount = snap.weights()
+        _, columns = self._reduce(None, snap.price[mask], percentiles,
+                                  quantity[mask], amount[mask])
+        if not len(columns["count"]):
+            return _empty_stats(percentiles)
+        return {name: values[0].item() for name, values in columns.items()}
+
+    def group_stats(self, table_name: str, by: Sequence[str],
+                    criteria: Optional[dict] = None,
+                    ids: Optional[Iterable[int]] = None,
+                    date_range: Optional[Tuple[Optional[str], Optional[str]]] = None,
+                    percentiles: Sequence[float] = DEFAULT_PERCENTILES) -> List[dict]:
+        """Thống kê giá theo nhóm `by` (các cột trong KEY_COLUMNS).
+
+        Returns: list dict, mỗi dict gồm giá trị khóa (đã chuẩn hóa) của từng
+        cột trong `by` và các chỉ số như summary(); nhóm đông nhất lên đầu.
+        """
+        snap = self.table(table_name)
+        by = [col for col in by if snap.has_codes(col)]
+        if not by:
+            stats = self.summary(table_name, criteria, ids, date_range, percentiles)
+            return [stats] if stats["count"] else []
+
+        mask = self._mask(snap, criteria, ids, date_range)
+        keys, decode = _combine_codes(
+            [snap.codes(col)[mask] for col in by], [len(snap.categories(col)) for col in by]
+        )
+        quantity, amount = snap.weights()
+        group_keys, columns = self._reduce(keys, snap.price[mask], percentiles,
+                                           quantity[mask], amount[mask])
+
+        # Nhóm đông nhất lên đầu (ổn định theo khóa)
+        order = np.argsort(-columns["count"], kind="stable")
+        fields = {}
+        for col, codes in zip(by, decode(group_keys[order])):
+            cats = snap.categories(col)
+            fields[col] = [cats[c] for c in codes.tolist()]
+        for name, values in columns.items():
+            fields[name] = values[order].tolist()
+        names = list(fields)
+        return [dict(zip(names, row)) for row in zip(*fields.values())]
+
+    def prices_by_key(self, table_name: str, columns: Sequence[str],
+                      key_values: Sequence[Sequence[str]]) -> Optional[List[List[float]]]:
+        """Giá (đã sắp tăng dần) của từng bộ giá trị khóa, trong một lượt.
+
+        columns: các cột so khớp chính xác; key_values: mỗi phần tử là bộ
+        giá trị tương ứng với columns (vd. một dòng kế hoạch).
+        Returns: [(giá đã sắp, tổng số lượng, tổng thành tiền)] theo đúng thứ
+        tự key_values; None nếu có cột không nằm trong KEY_COLUMNS (để
+        DatabaseManager dùng đường SQL).
+        """
+        snap = self.table(table_name)
+        if not columns or not all(snap.has_codes(col) for col in columns):
+            return None
+
+        line_codes = [
+            np.fromiter((snap.code_of(col, values[i]) for values in key_values),
+                        dtype=np.int32, count=len(key_values))
+            for i, col in enumerate(columns)
+        ]
+        missing = np.zeros(len(key_values), dtype=bool)
+        for codes in line_codes:
+            missing |= codes < 0
+        # Mã khóa của dòng dữ liệu và của dòng kế hoạch ghép cùng một hệ
+        has_price = ~np.isnan(snap.price)
+        keys, _ = _combine_codes(
+            [np.concatenate([snap.codes(col)[has_price], np.maximum(codes, 0)])
+             for col, codes in zip(columns, line_codes)],
+            [len(snap.categories(col)) for col in columns]
+        )
+        n_rows = int(has_price.sum())
+        row_keys, wanted = keys[:n_rows], keys[n_rows:]
+        selected = np.isin(row_keys, wanted[~missing])
+        row_keys = row_keys[selected]
+        prices = snap.price[has_price][selected]
+        quantity, amount = (w[has_price][selected] for w in snap.weights())
+
+        # Một lần sắp (khóa, giá) rồi cắt đoạn cho từng dòng kế hoạch
+        order = np.lexsort((prices, row_keys))
+        row_keys = row_keys[order]
+        prices = prices[order]
+        cum_quantity = np.r_[0.0, np.cumsum(quantity[order])]
+        cum_amount = np.r_[0.0, np.cumsum(amount[order])]
+        starts = np.searchsorted(row_keys, wanted, side="left")
+        ends = np.searchsorted(row_keys, wanted, side="right")
+        lines = []
+        for i in range(len(key_values)):
+            if missing[i]:
+                lines.append(([], 0, 0))
+                continue
+            start, end = starts[i], ends[i]
+            lines.append((prices[start:end].tolist(),
+                          (cum_quantity[end] - cum_quantity[start]).item(),
+                          (cum_amount[end] - cum_amount[start]).item()))
+        return lines
+
+    @staticmethod
+    def _reduce(keys, prices, percentiles: Sequence[float], quantity=None, amount=None):
+        """Gom theo khóa trên mảng đã sắp (khóa, giá).
+
+        keys = None: cả mảng là một nhóm. quantity/amount (từ weights()): thêm
+        'volume' và 'weighted_mean'. Returns: (khóa từng nhóm, {chỉ số: mảng})
+        """
+        weighted = quantity is not None
+        if keys is None:
+            order = np.argsort(prices, kind="stable")
+            prices = prices[order]
+            starts = np.zeros(1 if len(prices) else 0, dtype=np.int64)
+            group_keys = np.zeros(len(starts), dtype=np.int64)
+        else:
+            order = np.lexsort((prices, keys))
+            keys = keys[order]
+            prices = prices[order]
+        if weighted:
+            quantity = quantity[order]
+            amount = amount[order]
+            starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]]) if len(keys) \
+                else np.zeros(0, dtype=np.int64)
+            group_keys = keys[starts]
+        ends = np.r_[starts[1:], len(prices)].astype(np.int64)
+        counts = ends - starts
+        if not len(starts):
+            empty = np.zeros(0)
+            columns = {name: empty for name in ("count", "min", "max", "mean", "median")}
+            columns.update({f"p{q:g}": empty for q in percentiles})
+            if weighted:
+                columns.update(volume=empty, weighted_mean=empty)
+            return group_keys, columns
+
+        columns = {
+            "count": counts,
+            "min": prices[starts],
+            "max": prices[ends - 1],
+            "mean": np.add.reduceat(prices, starts) / counts,
+            "median": _segment_percentile(prices, starts, counts, 50),
+        }
+        for q in percentiles:
+            columns[f"p{q:g}"] = _segment_percentile(prices, starts, counts, q)
+        if weighted:
+            volume = np.add.reduceat(quantity, starts)
+            total = np.add.reduceat(amount, starts)
+            columns["volume"] = volume
+            columns["weighted_mean"] = np.divide(total, volume, out=np.zeros_like(total),
+                                                 where=volume > 0)
+        return group_keys, columns
+
+
+def _segment_percentile(sorted_values, starts, counts, q: float):
+    """Percentile nội suy tuyến tính trên từng đoạn đã sắp xếp
+    (q=50 trùng statistics.median)."""
+    pos = (counts - 1) * (q / 100.0)
+    lo = np.floor(pos).astype(np.int64)
+    hi = np.ceil(pos).astype(np.int64)
+    frac = pos - lo
+    low_values = sorted_values[starts + lo]
+    high_values = sorted_values[starts + hi]
+    return low_values + (high_values - low_values) * frac
+
+
+def _combine_codes(code_arrays: List["np.ndarray"], sizes: List[int]):
+    """Ghép nhiều cột mã thành một khóa int64.
+    Returns: (khóa, decode(mảng khóa) -> list mảng mã theo từng cột)."""
+    sizes = [max(size, 1) for size in sizes]
+    product = 1
+    for size in sizes:
+        product *= size
+    if product < 2 ** 62:
+        keys = np.zeros(len(code_arrays[0]), dtype=np.int64)
+        for codes, size in zip(code_arrays, sizes):
+            keys = keys * size + codes
+
+        def decode(key_array):
+            parts = []
+            for size in reversed(sizes):
+                key_array, part = np.divmod(key_array, size)
+                parts.append(part)
+            return parts[::-1]
+
+        return keys, decode
+
+    # Quá nhiều tổ hợp: đánh số lại các tổ hợp thực sự xuất hiện
+    stacked = np.stack(code_arrays, axis=1)
+    uniques, inverse = np.unique(stacked, axis=0, return_inverse=True)
+    return inverse.reshape(-1).astype(np.int64), lambda key_array: list(uniques[key_array].T)
+
+
+def _empty_stats(percentiles: Sequence[float]) -> dict:
+    stats = {"count": 0, "min": 0, "max": 0, "mean": 0, "median": 0}
+    for q in percentiles:
+        stats[f"p{q:g}"] = 0
+    stats.update(volume=0, weighted_mean=0)
+    return stats
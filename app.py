@@ -3,13 +3,14 @@ Main Application Window - Tra Cứu Giá Thuốc
 Menu-based navigation với QStackedWidget
 """
 
+import os
 import sys
 from PyQt6.QtWidgets import (
     QMainWindow, QStackedWidget, QStatusBar, QMenuBar,
     QApplication, QMessageBox, QLabel, QWidget, QVBoxLayout,
     QToolButton
 )
-from PyQt6.QtCore import Qt
+from PyQt6.QtCore import Qt, QTimer
 from PyQt6.QtGui import QAction, QFont
 
 from database import DatabaseManager
@@ -88,10 +89,26 @@ class MainWindow(QMainWindow):
         6: "Bảo hiểm xã hội",
     }
 
+    # Trang tra cứu theo index: (thuộc tính trên MainWindow, lớp tab).
+    # Tab chỉ được tạo (query + style) khi hiển thị lần đầu hoặc khi app rảnh.
+    PAGE_FACTORIES = {
+        1: ("tab_generic", GenericTab),
+        2: ("tab_biet_duoc", BietDuocTab),
+        3: ("tab_duoc_lieu", DuocLieuTab),
+        4: ("tab_duoc_lieu_raw", DuocLieuRawTab),
+        5: ("tab_vi_thuoc", ViThuocTab),
+        6: ("tab_bhxh", BHXHTab),
+    }
+    # Chờ sau khi cửa sổ hiện rồi mới tạo dần các tab còn lại (ms)
+    WARMUP_DELAY_MS = 1500
+
     def __init__(self, session: Session):
         super().__init__()
         self.session = session
         self.db = DatabaseManager()
+        self.db.profiler.enable_file_log(
+            os.path.join(os.path.dirname(self.db.db_path), "logs", "queries.log")
+        )
         self.theme_manager = ThemeManager()
         self._setup_window()
         self._setup_menu()
@@ -128,6 +145,10 @@ class MainWindow(QMainWindow):
         about_action.triggered.connect(self._show_about)
         file_menu.addAction(about_action)
 
+        diagnostics_action = QAction("🩺 Chẩn đoán truy vấn", self)
+        diagnostics_action.triggered.connect(self._show_query_diagnostics)
+        file_menu.addAction(diagnostics_action)
+
         file_menu.addSeparator()
 
         logout_action = QAction("🚪 Đăng xuất", self)
@@ -223,39 +244,75 @@ class MainWindow(QMainWindow):
         compare_action.triggered.connect(self._show_compare_price)
         lcnt_menu.addAction(compare_action)
 
+        trend_action = QAction("📈 Xu hướng giá theo tháng/quý", self)
+        trend_action.triggered.connect(self._show_price_trend)
+        lcnt_menu.addAction(trend_action)
+
     def _show_compare_price(self):
         """Mở dialog đối chiếu giá."""
         from tabs.compare_price_dialog import ComparePriceDialog
         dialog = ComparePriceDialog(self.db, self)
         dialog.exec()
 
+    def _show_price_trend(self):
+        """Mở dialog xu hướng giá (theo bảng của trang đang xem)."""
+        from tabs.price_trend_dialog import PriceTrendDialog
+        table_name = getattr(self.stack.currentWidget(), "TABLE_NAME", None) or "thuoc_generic"
+        dialog = PriceTrendDialog(self.db, table_name, self)
+        dialog.exec()
+
+    def _show_query_diagnostics(self):
+        """Mở bảng thống kê thời gian truy vấn."""
+        from tabs.diagnostics_dialog import QueryDiagnosticsDialog
+        dialog = QueryDiagnosticsDialog(self.db, self)
+        dialog.exec()
+
     def _setup_pages(self):
-        """Tạo QStackedWidget với các trang."""
+        """Tạo QStackedWidget với các trang (tab tra cứu tạo khi cần)."""
         self.stack = QStackedWidget()
-        is_admin = self.session.is_admin
 
         # Index 0: Welcome page
         self.welcome_page = WelcomeWidget(self.session)
         self.stack.addWidget(self.welcome_page)
 
-        # Index 1-5: Mua sắm công tabs
-        self.tab_generic = GenericTab(self.db, is_admin)
-        self.tab_biet_duoc = BietDuocTab(self.db, is_admin)
-        self.tab_duoc_lieu = DuocLieuTab(self.db, is_admin)
-        self.tab_duoc_lieu_raw = DuocLieuRawTab(self.db, is_admin)
-        self.tab_vi_thuoc = ViThuocTab(self.db, is_admin)
-
-        self.stack.addWidget(self.tab_generic)      # 1
-        self.stack.addWidget(self.tab_biet_duoc)     # 2
-        self.stack.addWidget(self.tab_duoc_lieu)      # 3
-        self.stack.addWidget(self.tab_duoc_lieu_raw)  # 4
-        self.stack.addWidget(self.tab_vi_thuoc)       # 5
-
-        # Index 6: BHXH
-        self.tab_bhxh = BHXHTab(self.db, is_admin)
-        self.stack.addWidget(self.tab_bhxh)           # 6
+        # Index 1-6: placeholder, thay bằng tab thật ở _ensure_page
+        for index in sorted(self.PAGE_FACTORIES):
+            attr, _ = self.PAGE_FACTORIES[index]
+            setattr(self, attr, None)
+            self.stack.addWidget(QWidget())
 
         self.setCentralWidget(self.stack)
+        self._warmup_started = False
+
+    def _ensure_page(self, index: int):
+        """Tạo tab ở index nếu chưa có. Returns: widget của trang."""
+        if index not in self.PAGE_FACTORIES:
+            return self.stack.widget(index)
+        attr, tab_class = self.PAGE_FACTORIES[index]
+        page = getattr(self, attr)
+        if page is None:
+            page = tab_class(self.db, self.session.is_admin)
+            placeholder = self.stack.widget(index)
+            self.stack.insertWidget(index, page)
+            self.stack.removeWidget(placeholder)
+            placeholder.deleteLater()
+            setattr(self, attr, page)
+        return page
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        if not self._warmup_started:
+            self._warmup_started = True
+            QTimer.singleShot(self.WARMUP_DELAY_MS, self._warm_up_next_page)
+
+    def _warm_up_next_page(self):
+        """Tạo trước từng tab còn thiếu, mỗi lượt một tab để UI không bị khựng."""
+        for index in sorted(self.PAGE_FACTORIES):
+            attr, _ = self.PAGE_FACTORIES[index]
+            if getattr(self, attr) is None:
+                self._ensure_page(index)
+                QTimer.singleShot(0, self._warm_up_next_page)
+                return
 
     def _setup_statusbar(self):
         """Tạo status bar."""
@@ -270,6 +327,7 @@ class MainWindow(QMainWindow):
     def _switch_page(self, index: int):
         """Chuyển trang hiển thị."""
         if 0 <= index < self.stack.count():
+            self._ensure_page(index)
             self.stack.setCurrentIndex(index)
             tab_name = self.TAB_NAMES.get(index, "")
             role_emoji = "👑" if self.session.is_admin else "👤"
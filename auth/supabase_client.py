@@ -6,7 +6,6 @@ Lưu tài khoản trong bảng app_users trên Supabase (không cần email)
 import os
 import hashlib
 import secrets
-import httpx
 from dotenv import load_dotenv
 
 import sys
@@ -69,6 +68,8 @@ class SupabaseAuth:
         Đăng nhập bằng username/password.
         Returns: (success, message, user_data)
         """
+        import httpx
+
         try:
             # Tìm user theo username
             url = (
@@ -111,6 +112,8 @@ class SupabaseAuth:
         Tạo tài khoản mới (Admin only).
         Returns: (success, message)
         """
+        import httpx
+
         try:
             # Kiểm tra username đã tồn tại chưa
             check_url = (
@@ -149,6 +152,8 @@ class SupabaseAuth:
         self, username: str, new_password: str
     ) -> tuple[bool, str]:
         """Đổi mật khẩu (Admin only)."""
+        import httpx
+
         try:
             pw_hash, salt = _hash_password(new_password)
             url = (
@@ -169,6 +174,8 @@ class SupabaseAuth:
 
     def delete_user(self, username: str) -> tuple[bool, str]:
         """Xóa tài khoản (Admin only)."""
+        import httpx
+
         try:
             url = (
                 f"{self.supabase_url}/rest/v1/app_users"
@@ -187,6 +194,8 @@ class SupabaseAuth:
 
     def get_all_users(self) -> list[dict]:
         """Lấy danh sách tất cả tài khoản."""
+        import httpx
+
         try:
             url = (
                 f"{self.supabase_url}/rest/v1/app_users"
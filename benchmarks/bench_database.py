@@ -0,0 +1,247 @@
+"""
+Benchmark DatabaseManager trên dữ liệu giả lập 100k / 1M / 5M dòng.
+
+Đo: import (CSV), replace_all_data (sync), tìm từ khóa (3 chế độ), tìm có
+bộ lọc, phân trang sắp xếp ở offset sâu, đếm, giá trị distinct, thống kê giá
+và đối chiếu tự động theo lô. Kết quả ghi ra JSON để so với baseline.
+
+Chạy (từ thư mục gốc repo):
+    python -m benchmarks.bench_database --sizes 100k --output benchmarks/results/run.json
+    python -m benchmarks.bench_database --sizes 100k --baseline benchmarks/results/base.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import sys
+import time
+from datetime import datetime
+from typing import Callable, Dict, List
+
+from database import DatabaseManager
+from benchmarks.data_generator import generate_rows, write_csv, INGREDIENTS, STRENGTHS, FORMS, GROUPS
+
+SIZE_ALIASES = {"100k": 100_000, "1m": 1_000_000, "5m": 5_000_000}
+# Số dòng kế hoạch cho phép đối chiếu tự động theo lô
+COMPARE_LINES = 200
+# Hệ số chậm hơn baseline bị coi là hồi quy
+REGRESSION_RATIO = 1.25
+
+
+def parse_size(text: str) -> int:
+    text = text.strip().lower()
+    if text in SIZE_ALIASES:
+        return SIZE_ALIASES[text]
+    return int(text.replace("_", ""))
+
+
+def _timed(fn: Callable, repeat: int) -> Dict[str, float]:
+    """Chạy fn `repeat` lần, trả về median/min (ms)."""
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return {"median_ms": statistics.median(samples), "min_ms": min(samples), "runs": repeat}
+
+
+# Cột dùng trong phép đo theo từng bảng (BHXH đặt tên cột khác bảng thầu)
+BENCH_COLUMNS = {
+    "thuoc_generic": {
+        "name": "ten_hoat_chat", "strength": "nong_do_ham_luong", "group": "nhom_thuoc",
+        "price": "don_gia", "date": "ngay_ban_hanh",
+    },
+    "bhxh": {
+        "name": "hoat_chat", "strength": "ham_luong", "group": "nhom_tckt",
+        "price": "gia", "date": "ngay_cong_bo",
+    },
+}
+
+
+def _compare_lines(table_name: str, count: int, seed: int) -> List[dict]:
+    """Các dòng kế hoạch giả lập cho đối chiếu (tiêu chí giống AutoCompareWorker)."""
+    rng = random.Random(f"compare-{seed}")
+    cols = BENCH_COLUMNS[table_name]
+    return [
+        {
+            cols["name"]: rng.choice(INGREDIENTS),
+            cols["strength"]: rng.choice(STRENGTHS),
+            "dang_bao_che": rng.choice(FORMS),
+            cols["group"]: rng.choice(GROUPS),
+        }
+        for _ in range(count)
+    ]
+
+
+def bench_table(db: DatabaseManager, table_name: str, rows: int, workdir: str,
+                repeat: int, seed: int) -> Dict[str, dict]:
+    results: Dict[str, dict] = {}
+    cols = BENCH_COLUMNS[table_name]
+
+    def log(op: str):
+        r = results[op]
+        print(f"  {table_name:<14} {op:<28} {r['median_ms']:>10.1f} ms")
+
+    # --- Ingest ---
+    csv_path = os.path.join(workdir, f"{table_name}_{rows}.csv")
+    if not os.path.exists(csv_path):
+        write_csv(table_name, rows, csv_path, seed)
+    results["import_csv"] = _timed(lambda: db.import_from_excel(table_name, csv_path), 1)
+    log("import_csv")
+
+    data = list(generate_rows(table_name, rows, seed))
+    results["replace_all_data"] = _timed(lambda: db.replace_all_data(table_name, data), 1)
+    log("replace_all_data")
+    del data
+
+    # --- Truy vấn ---
+    name_col, date_col, price_col = cols["name"], cols["date"], cols["price"]
+    filter_col = "dang_bao_che"
+    deep_offset = max(0, rows - 1000)
+
+    queries = {
+        "search_contains": lambda: db.search_data(table_name, "amoxicillin", limit=50, search_mode="contains"),
+        "search_unaccent": lambda: db.search_data(table_name, "vien nen", limit=50, search_mode="unaccent"),
+        "search_fuzzy": lambda: db.search_data(table_name, "Amoxicilin", limit=50, search_mode="fuzzy"),
+        "search_filtered": lambda: db.search_data(
+            table_name, "paracetamol", filters=[(filter_col, "viên nén")],
+            search_column=name_col, limit=50, search_mode="unaccent",
+            date_filters={"column": date_col, "start": "01/01/2024", "end": "31/12/2024"},
+        ),
+        "sorted_page_deep_offset": lambda: db.search_data(
+            table_name, "", limit=50, offset=deep_offset, sort_column=price_col, sort_order="DESC"
+        ),
+        "count_unaccent": lambda: db.count_search_data(table_name, "vien nen", search_mode="unaccent"),
+        "count_filtered": lambda: db.count_search_data(
+            table_name, "", filters=[(filter_col, "tiêm")], search_mode="unaccent"
+        ),
+        "distinct_values": lambda: db.get_distinct_values(table_name, filter_col),
+        "price_statistics": lambda: db.get_price_statistics(table_name, {name_col: "Paracetamol"}),
+        "price_trend_quarter": lambda: db.get_price_trend(table_name, "Paracetamol", "quarter"),
+    }
+    for op, fn in queries.items():
+        results[op] = _timed(fn, repeat)
+        log(op)
+
+    lines = _compare_lines(table_name, COMPARE_LINES, seed)
+
+    def batch_compare():
+        for criteria in lines:
+            db.get_price_statistics(table_name, criteria)
+
+    results["batch_compare"] = _timed(batch_compare, max(1, repeat // 2))
+    results["batch_compare"]["lines"] = COMPARE_LINES
+    log("batch_compare")
+
+    # Cùng các dòng kế hoạch, một lượt (percentile/IQR/histogram cho mọi dòng)
+    results["batch_distribution"] = _timed(
+        lambda: db.get_price_distributions(table_name, lines), max(1, repeat // 2)
+    )
+    results["batch_distribution"]["lines"] = COMPARE_LINES
+    log("batch_distribution")
+
+    # --- Analytics dạng cột (chỉ khi có NumPy) ---
+    engine = db.analytics
+    if engine is not None:
+        engine.invalidate(table_name)
+        results["analytics_load"] = _timed(lambda: engine.table(table_name), 1)
+        log("analytics_load")
+        by = [cols["name"], cols["strength"], "dang_bao_che", cols["group"]]
+        analytics_ops = {
+            "analytics_summary": lambda: engine.summary(table_name),
+            "analytics_group_stats": lambda: engine.group_stats(table_name, by),
+            "analytics_filtered": lambda: engine.summary(
+                table_name, {name_col: "Paracetamol"}, date_range=("01/01/2024", "31/12/2024")
+            ),
+        }
+        for op, fn in analytics_ops.items():
+            results[op] = _timed(fn, repeat)
+            log(op)
+    return results
+
+
+def compare_with_baseline(current: dict, baseline: dict) -> List[str]:
+    """In bảng tỷ lệ so với baseline; trả về danh sách phép đo bị hồi quy."""
+    regressions = []
+    base_runs = baseline.get("results", {})
+    for size, tables in current["results"].items():
+        for table_name, ops in tables.items():
+            for op, cur in ops.items():
+                base = base_runs.get(size, {}).get(table_name, {}).get(op)
+                if not base or not base.get("median_ms"):
+                    continue
+                ratio = cur["median_ms"] / base["median_ms"]
+                mark = ""
+                if ratio > REGRESSION_RATIO:
+                    mark = "  << chậm hơn"
+                    regressions.append(f"{size}/{table_name}/{op}")
+                print(f"  {size:>8} {table_name:<14} {op:<28} "
+                      f"{base['median_ms']:>10.1f} -> {cur['median_ms']:>10.1f} ms  x{ratio:.2f}{mark}")
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark DatabaseManager")
+    parser.add_argument("--sizes", default="100k", help="Ví dụ: 100k,1m,5m hoặc 20000")
+    parser.add_argument("--tables", default=",".join(BENCH_COLUMNS))
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--workdir", default=os.path.join("benchmarks", "results", "work"))
+    parser.add_argument("--output", default=None, help="File JSON kết quả")
+    parser.add_argument("--baseline", default=None, help="File JSON baseline để so sánh")
+    args = parser.parse_args(argv)
+
+    os.makedirs(args.workdir, exist_ok=True)
+    sizes = [parse_size(s) for s in args.sizes.split(",") if s.strip()]
+    tables = [t.strip() for t in args.tables.split(",") if t.strip()]
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "repeat": args.repeat,
+            "seed": args.seed,
+        },
+        "results": {},
+    }
+
+    for rows in sizes:
+        print(f"== {rows:,} dòng ==")
+        db_path = os.path.join(args.workdir, f"bench_{rows}.db")
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(db_path + suffix):
+                os.remove(db_path + suffix)
+        db = DatabaseManager(db_path)
+        report["results"][str(rows)] = {
+            table_name: bench_table(db, table_name, rows, args.workdir, args.repeat, args.seed)
+            for table_name in tables
+        }
+        report["meta"].setdefault("db_size_mb", {})[str(rows)] = round(
+            os.path.getsize(db_path) / 1_048_576, 1
+        )
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"Đã ghi {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        print(f"== So với baseline {args.baseline} ==")
+        regressions = compare_with_baseline(report, baseline)
+        if regressions:
+            print(f"{len(regressions)} phép đo chậm hơn {REGRESSION_RATIO}x baseline")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,103 @@
+"""
+Đo thời gian import lúc khởi động bằng `python -X importtime`.
+
+Chạy tập module mà main.py cần để hiện cửa sổ đăng nhập + cửa sổ chính
+trong một tiến trình mới, cộng thời gian import và báo module nặng nào
+(pandas, openpyxl, httpx, requests) bị kéo vào. Exit 1 nếu có module nặng
+hoặc vượt ngân sách --budget-ms -> dùng làm chốt chặn hồi quy.
+
+Chạy (từ thư mục gốc repo):
+    python -m benchmarks.bench_startup
+    python -m benchmarks.bench_startup --budget-ms 800 --output benchmarks/results/startup.json
+"""
+
+import argparse
+import importlib.util
+import json
+import os
+import subprocess
+import sys
+from typing import Dict, List
+
+from lazy_imports import HEAVY_MODULES
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Module main.py import trước khi cửa sổ chính hiện ra
+GUI_STARTUP_MODULES = ["auth.login_dialog", "lazy_imports", "app"]
+# Khi không có PyQt6 (CI/headless): phần lõi không phụ thuộc Qt
+CORE_STARTUP_MODULES = [
+    "database", "supabase_manager", "auth.supabase_client",
+    "normalizer", "query_profiler", "lazy_imports",
+]
+
+
+def startup_modules() -> List[str]:
+    if importlib.util.find_spec("PyQt6") is not None:
+        return GUI_STARTUP_MODULES
+    return CORE_STARTUP_MODULES
+
+
+def measure(modules: List[str]) -> Dict[str, object]:
+    """Import `modules` trong tiến trình mới với -X importtime, trả về thống kê."""
+    code = "; ".join(f"import {name}" for name in modules)
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT_DIR, capture_output=True, text=True
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr else "import lỗi")
+
+    entries = []
+    for line in proc.stderr.splitlines():
+        # "import time:       123 |        456 |   package.module"
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        # Module con được thụt lề thêm 2 khoảng trắng sau 1 khoảng đầu cột
+        entries.append((name[1:].rstrip(), int(self_us), int(cumulative_us)))
+
+    imported = {name.strip() for name, _, _ in entries}
+    top_level = [e for e in entries if not e[0].startswith(" ")]
+    return {
+        "modules": modules,
+        "total_ms": sum(self_us for _, self_us, _ in entries) / 1000,
+        "module_count": len(entries),
+        "heavy_imported": sorted(m for m in HEAVY_MODULES if m in imported),
+        "slowest": [
+            {"module": name, "cumulative_ms": cum / 1000}
+            for name, _, cum in sorted(top_level, key=lambda e: e[2], reverse=True)[:15]
+        ],
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Đo thời gian import lúc khởi động")
+    parser.add_argument("--budget-ms", type=float, default=None,
+                        help="Ngân sách tổng thời gian import (ms)")
+    parser.add_argument("--output", default=None, help="File JSON kết quả")
+    args = parser.parse_args(argv)
+
+    report = measure(startup_modules())
+    print(f"Module khởi động: {', '.join(report['modules'])}")
+    print(f"Tổng import: {report['total_ms']:.1f} ms ({report['module_count']} module)")
+    for item in report["slowest"]:
+        print(f"  {item['module']:<30} {item['cumulative_ms']:>8.1f} ms")
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+    failed = False
+    if report["heavy_imported"]:
+        print(f"LỖI: module nặng bị nạp lúc khởi động: {', '.join(report['heavy_imported'])}")
+        failed = True
+    if args.budget_ms is not None and report["total_ms"] > args.budget_ms:
+        print(f"LỖI: vượt ngân sách {args.budget_ms:.0f} ms")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,186 @@
+"""
+Sinh dữ liệu giả lập (tất định theo seed) cho benchmark.
+Phân bố gần với dữ liệu thật: vài trăm hoạt chất, tên thương mại lặp lại,
+giá lệch phải, ngày trải 2022-2025, tên có dấu tiếng Việt.
+
+Chạy: python -m benchmarks.data_generator thuoc_generic 100000 out.csv
+"""
+
+import csv
+import random
+import sys
+from typing import Iterator, Tuple
+
+from database import TABLE_SCHEMAS, TABLE_HEADERS
+
+INGREDIENTS = [
+    "Paracetamol", "Amoxicillin", "Amoxicillin + Acid clavulanic", "Cefuroxim",
+    "Ceftriaxon", "Cefixim", "Azithromycin", "Clarithromycin", "Ciprofloxacin",
+    "Levofloxacin", "Metformin", "Gliclazid", "Insulin glargine", "Amlodipin",
+    "Losartan", "Telmisartan", "Bisoprolol", "Atorvastatin", "Rosuvastatin",
+    "Clopidogrel", "Aspirin", "Omeprazol", "Esomeprazol", "Pantoprazol",
+    "Domperidon", "Metoclopramid", "Ibuprofen", "Diclofenac", "Meloxicam",
+    "Methylprednisolon", "Dexamethason", "Prednisolon", "Salbutamol",
+    "Budesonid", "Cetirizin", "Loratadin", "Vitamin B1 + B6 + B12",
+    "Kali clorid", "Natri clorid", "Glucose", "Ringer lactat", "Heparin",
+    "Enoxaparin", "Furosemid", "Spironolacton", "Captopril", "Enalapril",
+    "Nifedipin", "Diazepam", "Gabapentin", "Pregabalin", "Tramadol",
+    "Morphin", "Fentanyl", "Lidocain", "Bupivacain", "Propofol",
+    "Vancomycin", "Meropenem", "Imipenem + Cilastatin", "Piperacilin + Tazobactam",
+    "Fluconazol", "Aciclovir", "Oseltamivir", "Albendazol", "Metronidazol",
+    "Cao bạch quả", "Hoạt huyết dưỡng não", "Diệp hạ châu", "Actiso",
+]
+STRENGTHS = [
+    "500mg", "250mg", "1g", "2g", "5mg", "10mg", "20mg", "40mg", "80mg",
+    "100mg", "0,9%", "5%", "250mg/5ml", "1g/10ml", "40mg/0,4ml", "4mg/ml",
+]
+FORMS = [
+    "Viên nén", "Viên nén bao phim", "Viên nang cứng", "Viên sủi",
+    "Thuốc bột pha tiêm", "Dung dịch tiêm", "Dung dịch tiêm truyền",
+    "Hỗn dịch uống", "Thuốc cốm", "Siro", "Thuốc mỡ", "Khí dung",
+]
+ROUTES = ["Uống", "Tiêm", "Tiêm truyền", "Dùng ngoài", "Hít", "Đặt"]
+UNITS = ["Viên", "Ống", "Lọ", "Chai", "Túi", "Gói", "Tuýp", "Bút tiêm"]
+GROUPS = ["Nhóm 1", "Nhóm 2", "Nhóm 3", "Nhóm 4", "Nhóm 5"]
+COUNTRIES = [
+    "Việt Nam", "Việt Nam", "Việt Nam", "Ấn Độ", "Hàn Quốc", "Pháp", "Đức",
+    "Ý", "Tây Ban Nha", "Hungary", "Ba Lan", "Trung Quốc", "Thái Lan", "Mỹ",
+]
+MANUFACTURERS = [
+    "Công ty CP Dược Hậu Giang", "Công ty CP Traphaco", "Công ty CP Pymepharco",
+    "Công ty CP Dược phẩm Imexpharm", "Công ty TNHH Stella", "Sanofi Winthrop",
+    "Abbott", "Pfizer", "Novartis", "Servier", "Boehringer Ingelheim",
+    "Công ty CP Dược phẩm Trung ương 1", "Công ty CP Dược phẩm Hà Tây",
+    "Mekophar", "Domesco", "Savipharm", "Ấn Độ Cadila", "Hanmi",
+]
+PROVINCES = [
+    ("01", "Hà Nội"), ("79", "TP Hồ Chí Minh"), ("48", "Đà Nẵng"),
+    ("31", "Hải Phòng"), ("92", "Cần Thơ"), ("38", "Thanh Hóa"),
+    ("40", "Nghệ An"), ("46", "Thừa Thiên Huế"), ("56", "Khánh Hòa"),
+    ("75", "Đồng Nai"), ("74", "Bình Dương"), ("22", "Quảng Ninh"),
+]
+INVESTORS = [
+    "Bệnh viện Bạch Mai", "Bệnh viện Chợ Rẫy", "Bệnh viện Trung ương Huế",
+    "Sở Y tế Hà Nội", "Sở Y tế TP Hồ Chí Minh", "Bệnh viện Đa khoa tỉnh",
+    "Trung tâm Y tế huyện", "Bệnh viện Nhi Trung ương", "Bệnh viện K",
+]
+LCNT_FORMS = ["Đấu thầu rộng rãi", "Chào hàng cạnh tranh", "Chỉ định thầu", "Mua sắm trực tiếp"]
+HERBS = [
+    "Đương quy", "Bạch truật", "Hoàng kỳ", "Cam thảo", "Xuyên khung",
+    "Thục địa", "Đẳng sâm", "Phục linh", "Bạch thược", "Trần bì",
+]
+SYLLABLES = ["pa", "ra", "ce", "ta", "mol", "xi", "lin", "vo", "fen", "za", "dol", "tri", "na", "co"]
+
+# Giá cơ sở theo hoạt chất (VND), cố định theo seed riêng
+_BASE_PRICES = {
+    name: random.Random(i).choice([350, 800, 1500, 3200, 7500, 18000, 45000, 120000])
+    for i, name in enumerate(INGREDIENTS + HERBS)
+}
+
+
+def _fmt_money(value: int) -> str:
+    """12500 -> '12.500' (cách viết giá trong file thầu)."""
+    return f"{value:,}".replace(",", ".")
+
+
+def _date(rng: random.Random) -> str:
+    return f"{rng.randint(1, 28):02d}/{rng.randint(1, 12):02d}/{rng.randint(2022, 2025)}"
+
+
+def _brand(rng: random.Random, ingredient: str) -> str:
+    # Khoảng 8 tên thương mại cho mỗi hoạt chất
+    seed = rng.randint(0, 7)
+    brand_rng = random.Random(f"{ingredient}-{seed}")
+    name = "".join(brand_rng.choice(SYLLABLES) for _ in range(brand_rng.randint(2, 3)))
+    return f"{name.capitalize()} {rng.choice(STRENGTHS)}"
+
+
+def _price(rng: random.Random, name: str) -> int:
+    base = _BASE_PRICES.get(name, 1000)
+    return max(50, int(base * rng.lognormvariate(0, 0.35)) // 10 * 10)
+
+
+def _thuoc_row(rng: random.Random, i: int) -> Tuple[str, ...]:
+    ingredient = rng.choice(INGREDIENTS)
+    qty = rng.choice([100, 500, 1000, 2000, 5000, 10000, 50000])
+    return (
+        str(i + 1), _brand(rng, ingredient), ingredient, rng.choice(STRENGTHS),
+        f"VD-{rng.randint(10000, 40000)}-{rng.randint(15, 24)}", rng.choice(ROUTES),
+        rng.choice(FORMS), f"{rng.choice([24, 36, 48])} tháng",
+        rng.choice(MANUFACTURERS), rng.choice(COUNTRIES),
+        f"Hộp {rng.choice([1, 3, 10])} vỉ x 10 viên", rng.choice(UNITS),
+        _fmt_money(qty), _fmt_money(_price(rng, ingredient)), rng.choice(GROUPS),
+        f"IB{rng.randint(2200000000, 2500000000)}", rng.choice(INVESTORS),
+        rng.choice(LCNT_FORMS), _date(rng),
+        f"{rng.randint(1, 2000)}/QĐ-{rng.choice(['BV', 'SYT', 'TTYT'])}", _date(rng),
+        str(rng.randint(1, 12)), rng.choice(PROVINCES)[1],
+    )
+
+
+def _herb_row(rng: random.Random, i: int) -> Tuple[str, ...]:
+    herb = rng.choice(HERBS)
+    qty = rng.choice([10, 50, 100, 500, 1000])
+    return (
+        str(i + 1), herb, rng.choice(["Rễ", "Thân rễ", "Lá", "Quả", "Hạt"]),
+        f"Radix {herb}", rng.choice(["Nuôi trồng", "Thu hái tự nhiên", "Nhập khẩu"]),
+        rng.choice(["Phơi khô", "Sao vàng", "Chích mật"]),
+        f"GP-{rng.randint(1000, 9999)}", rng.choice(MANUFACTURERS),
+        rng.choice(COUNTRIES), "Túi 1kg", "Kg", _fmt_money(qty),
+        _fmt_money(_price(rng, herb)), rng.choice(GROUPS),
+        f"IB{rng.randint(2200000000, 2500000000)}", rng.choice(INVESTORS),
+        rng.choice(LCNT_FORMS), _date(rng),
+        f"{rng.randint(1, 2000)}/QĐ-BV", _date(rng), str(rng.randint(1, 8)),
+        rng.choice(PROVINCES)[1],
+    )
+
+
+def _bhxh_row(rng: random.Random, i: int) -> Tuple[str, ...]:
+    ingredient = rng.choice(INGREDIENTS)
+    province_code, province = rng.choice(PROVINCES)
+    qty = rng.choice([100, 500, 1000, 2000, 5000, 10000])
+    price = _price(rng, ingredient)
+    return (
+        province_code, province, rng.choice(INVESTORS), f"{province_code}{rng.randint(100, 999)}",
+        _brand(rng, ingredient), ingredient, rng.choice(ROUTES), rng.choice(FORMS),
+        rng.choice(STRENGTHS), f"Hộp {rng.choice([1, 3, 10])} vỉ x 10 viên",
+        f"VD-{rng.randint(10000, 40000)}-{rng.randint(15, 24)}",
+        rng.choice(MANUFACTURERS), rng.choice(COUNTRIES), rng.choice(UNITS),
+        _fmt_money(qty), _fmt_money(price), _fmt_money(qty * price),
+        f"Công ty {rng.choice(['TNHH', 'CP'])} Dược {rng.choice(SYLLABLES).capitalize()}",
+        f"{rng.randint(1, 2000)}/QĐ-SYT", _date(rng), rng.choice(GROUPS),
+        rng.choice(["Tân dược", "Chế phẩm YHCT", "Vắc xin"]),
+    )
+
+
+_ROW_FACTORIES = {
+    "thuoc_generic": _thuoc_row,
+    "thuoc_biet_duoc": _thuoc_row,
+    "thuoc_duoc_lieu": _thuoc_row,
+    "duoc_lieu": _herb_row,
+    "vi_thuoc": _herb_row,
+    "bhxh": _bhxh_row,
+}
+
+
+def generate_rows(table_name: str, count: int, seed: int = 42) -> Iterator[Tuple[str, ...]]:
+    """Sinh `count` dòng khớp TABLE_SCHEMAS[table_name] (cùng seed -> cùng dữ liệu)."""
+    factory = _ROW_FACTORIES[table_name]
+    rng = random.Random(f"{table_name}-{seed}")
+    for i in range(count):
+        yield factory(rng, i)
+
+
+def write_csv(table_name: str, count: int, path: str, seed: int = 42) -> str:
+    """Ghi file CSV có header giống file thầu (để đo import_from_excel)."""
+    with open(path, "w", newline="", encoding="utf-8-sig") as f:
+        writer = csv.writer(f)
+        writer.writerow(TABLE_HEADERS[table_name])
+        writer.writerows(generate_rows(table_name, count, seed))
+    return path
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 4 or sys.argv[1] not in TABLE_SCHEMAS:
+        print("Usage: python -m benchmarks.data_generator <table> <rows> <out.csv>")
+        sys.exit(1)
+    write_csv(sys.argv[1], int(sys.argv[2]), sys.argv[3])
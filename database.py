@@ -5,8 +5,11 @@ Sử dụng SQLite để lưu trữ dữ liệu thuốc
 
 import sqlite3
 import os
-import pandas as pd  # type: ignore
-from typing import Optional, List, Dict
+import time
+from typing import Optional, List, Dict, Tuple
+
+from normalizer import fold_text, trigrams
+from query_profiler import QueryProfiler
 
 
 # ============================================================
@@ -203,6 +206,148 @@ TABLE_DISPLAY_NAMES = {
     "bhxh": "Bảo hiểm xã hội",
 }
 
+# Chế độ tìm kiếm:
+# - "contains": LIKE trên dữ liệu gốc (phân biệt dấu)
+# - "unaccent": LIKE/MATCH trên bản không dấu đã tính sẵn (FTS5 trigram)
+# - "fuzzy": gần đúng theo trigram trên tên thuốc/hoạt chất (chịu lỗi chính tả)
+SEARCH_MODES = ("contains", "unaccent", "fuzzy")
+
+# Các cột tên được đánh index trigram cho tìm kiếm gần đúng
+FUZZY_COLUMNS = {
+    "thuoc_generic": ["ten_thuoc", "ten_hoat_chat"],
+    "thuoc_biet_duoc": ["ten_thuoc", "ten_hoat_chat"],
+    "thuoc_duoc_lieu": ["ten_thuoc", "ten_hoat_chat"],
+    "duoc_lieu": ["ten_duoc_lieu", "ten_khoa_hoc"],
+    "vi_thuoc": ["ten_vi_thuoc", "ten_khoa_hoc"],
+    "bhxh": ["ten_thuoc", "hoat_chat"],
+}
+
+# Cột số / ngày lưu dạng TEXT: có thêm cột sinh (generated) kiểu chuẩn để
+# sắp xếp và lọc đúng ("1000" > "200", ngày theo thứ tự thời gian)
+NUMERIC_COLUMNS = {
+    "stt", "so_luong", "don_gia", "don_gia_trung_thau", "gia",
+    "thanh_tien", "so_nha_thau",
+}
+DATE_COLUMNS = {"ngay_dang_tai", "ngay_ban_hanh", "ngay_cong_bo"}
+
+
+def sort_key_column(col_name: str) -> str:
+    """Tên cột dùng để sắp xếp/lọc: cột sinh kiểu chuẩn nếu có, ngược lại chính nó."""
+    if col_name in NUMERIC_COLUMNS:
+        return f"{col_name}_num"
+    if col_name in DATE_COLUMNS:
+        return f"{col_name}_iso"
+    return col_name
+
+
+def price_column(table_name: str) -> str:
+    """Cột đơn giá của bảng: don_gia (thuốc), don_gia_trung_thau (dược liệu/vị thuốc), gia (BHXH)."""
+    col_names = [col_name for col_name, _ in TABLE_SCHEMAS.get(table_name, [])]
+    if 'don_gia_trung_thau' in col_names:
+        return 'don_gia_trung_thau'
+    if 'gia' in col_names:
+        return 'gia'
+    return 'don_gia'
+
+
+def date_column(table_name: str) -> str:
+    """Cột ngày của bảng: ngay_cong_bo (BHXH) hoặc ngay_ban_hanh (các bảng khác)."""
+    col_names = [col_name for col_name, _ in TABLE_SCHEMAS.get(table_name, [])]
+    if 'ngay_cong_bo' in col_names:
+        return 'ngay_cong_bo'
+    return 'ngay_ban_hanh'
+
+
+def _weighted_sql(table_name: str) -> Tuple[str, str]:
+    """Biểu thức (số lượng, thành tiền) từng dòng để SUM() ra giá bình quân gia quyền.
+
+    Chỉ tính dòng có giá và số lượng > 0; thành tiền lấy thanh_tien (BHXH)
+    nếu có, ngược lại đơn giá x số lượng. BQ gia quyền = SUM(thành tiền) / SUM(số lượng).
+    """
+    price_key = sort_key_column(price_column(table_name))
+    col_names = [col_name for col_name, _ in TABLE_SCHEMAS.get(table_name, [])]
+    valid = f"{price_key} IS NOT NULL AND so_luong_num > 0"
+    amount = f"{price_key} * so_luong_num"
+    if 'thanh_tien' in col_names:
+        amount = f"COALESCE(thanh_tien_num, {amount})"
+    return (f"CASE WHEN {valid} THEN so_luong_num END",
+            f"CASE WHEN {valid} THEN {amount} END")
+
+
+def _weighted_mean(volume, amount) -> float:
+    return amount / volume if volume else 0
+
+
+def _typed_column_sql(col_name: str) -> Optional[str]:
+    """Định nghĩa cột sinh kiểu chuẩn cho cột số/ngày (None nếu không cần)."""
+    if col_name in NUMERIC_COLUMNS:
+        # Giống cách get_price_statistics đọc giá: bỏ dấu phân cách hàng nghìn
+        return (
+            f"{col_name}_num INTEGER GENERATED ALWAYS AS ("
+            f"CASE WHEN TRIM({col_name}) != '' THEN "
+            f"CAST(REPLACE(REPLACE(TRIM({col_name}), ',', ''), '.', '') AS INTEGER) "
+            f"END) VIRTUAL"
+        )
+    if col_name in DATE_COLUMNS:
+        # dd/mm/yyyy -> yyyy-mm-dd
+        return (
+            f"{col_name}_iso TEXT GENERATED ALWAYS AS ("
+            f"CASE WHEN length({col_name}) >= 10 THEN "
+            f"substr({col_name},7,4) || '-' || substr({col_name},4,2) || '-' || "
+            f"substr({col_name},1,2) END) VIRTUAL"
+        )
+    return None
+
+
+# Cột tên làm khóa thuốc cho bảng tổng hợp giá theo kỳ (price_rollups)
+DRUG_KEY_COLUMNS = {
+    "thuoc_generic": "ten_hoat_chat",
+    "thuoc_biet_duoc": "ten_hoat_chat",
+    "thuoc_duoc_lieu": "ten_hoat_chat",
+    "duoc_lieu": "ten_duoc_lieu",
+    "vi_thuoc": "ten_vi_thuoc",
+    "bhxh": "hoat_chat",
+}
+ROLLUP_PERIODS = ("month", "quarter")
+
+
+def rollup_period(date_value: str, period_type: str) -> Optional[str]:
+    """Kỳ của một ngày: 'yyyy-mm' (month) hoặc 'yyyy-Qn' (quarter).
+
+    date_value: dd/mm/yyyy hoặc yyyy-mm-dd. None nếu không đọc được.
+    """
+    if not date_value:
+        return None
+    value = date_value.strip()
+    if "/" in value:
+        parts = value.split("/")
+        if len(parts) != 3:
+            return None
+        year, month = parts[2][:4], parts[1]
+    else:
+        year, month = value[:4], value[5:7]
+    if not (year.isdigit() and month.isdigit() and 1 <= int(month) <= 12):
+        return None
+    if period_type == "quarter":
+        return f"{year}-Q{(int(month) - 1) // 3 + 1}"
+    return f"{year}-{int(month):02d}"
+
+
+# Ngưỡng mặc định: tỉ lệ trigram của từ khóa có trong tên (0..1)
+FUZZY_THRESHOLD = 0.5
+# Số tên gần đúng tối đa đưa vào truy vấn dữ liệu
+FUZZY_MAX_TERMS = 200
+
+
+def _fts_table(table_name: str) -> str:
+    """Tên bảng FTS chứa bản không dấu của bảng dữ liệu."""
+    return f"{table_name}_fts"
+
+
+def _fts_phrase(text: str) -> str:
+    """Đóng gói chuỗi thành phrase FTS5 (escape dấu nháy kép)."""
+    return '"' + text.replace('"', '""') + '"'
+
 
 class DatabaseManager:
     """Quản lý cơ sở dữ liệu SQLite cho ứng dụng Tra Cứu Giá Thuốc."""
@@ -214,6 +359,10 @@ class DatabaseManager:
             os.makedirs(data_dir, exist_ok=True)
             db_path = os.path.join(data_dir, "thuoc.db")
         self.db_path = db_path
+        self.fuzzy_threshold = FUZZY_THRESHOLD
+        # Đo thời gian search/count/stats/distinct (xem query_profiler.py)
+        self.profiler = QueryProfiler()
+        self._analytics = None
         self._init_database()
 
     def _get_connection(self) -> sqlite3.Connection:
@@ -221,6 +370,8 @@ class DatabaseManager:
         conn = sqlite3.connect(self.db_path)
         conn.execute("PRAGMA journal_mode=WAL")
         conn.execute("PRAGMA foreign_keys=ON")
+        # Dùng trong trigger để tính bản không dấu lúc ghi dữ liệu
+        conn.create_function("fold_vn", 1, fold_text, deterministic=True)
         return conn
 
     def _init_database(self):
@@ -236,10 +387,343 @@ class DatabaseManager:
                     f"CREATE TABLE IF NOT EXISTS {table_name} "
                     f"(id INTEGER PRIMARY KEY AUTOINCREMENT, {cols_sql})"
                 )
+                self._ensure_typed_columns(conn, table_name)
+                self._ensure_search_index(conn, table_name)
+                self._ensure_sort_indexes(conn, table_name)
+
+            # Posting list trigram cho tìm kiếm gần đúng (theo giá trị distinct)
+            cursor.execute(
+                "CREATE TABLE IF NOT EXISTS fuzzy_terms ("
+                "term_id INTEGER PRIMARY KEY, "
+                "table_name TEXT NOT NULL, "
+                "col_name TEXT NOT NULL, "
+                "term TEXT NOT NULL, "
+                "gram_count INTEGER NOT NULL, "
+                "UNIQUE (table_name, col_name, term))"
+            )
+            cursor.execute(
+                "CREATE TABLE IF NOT EXISTS fuzzy_grams ("
+                "gram TEXT NOT NULL, "
+                "term_id INTEGER NOT NULL, "
+                "PRIMARY KEY (gram, term_id)) WITHOUT ROWID"
+            )
+            cursor.execute(
+                "CREATE INDEX IF NOT EXISTS idx_fuzzy_grams_term "
+                "ON fuzzy_grams (term_id)"
+            )
+            # Tổng hợp giá theo tháng/quý cho từng khóa thuốc (xem _refresh_rollups)
+            rollups_exist = cursor.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = 'price_rollups'"
+            ).fetchone()
+            cursor.execute(
+                "CREATE TABLE IF NOT EXISTS price_rollups ("
+                "table_name TEXT NOT NULL, "
+                "drug_key TEXT NOT NULL, "
+                "period_type TEXT NOT NULL, "
+                "period TEXT NOT NULL, "
+                "drug_name TEXT, "
+                "count INTEGER NOT NULL, "
+                "min_price REAL, "
+                "median_price REAL, "
+                "max_price REAL, "
+                "mean_price REAL, "
+                "volume INTEGER, "
+                "amount REAL, "
+                "PRIMARY KEY (table_name, period_type, drug_key, period)) WITHOUT ROWID"
+            )
+            # Phiên bản dữ liệu theo bảng (tăng mỗi lần import/sync/xóa)
+            cursor.execute(
+                "CREATE TABLE IF NOT EXISTS data_versions ("
+                "table_name TEXT PRIMARY KEY, "
+                "version INTEGER NOT NULL DEFAULT 0)"
+            )
+            rollup_cols = {row[1] for row in cursor.execute("PRAGMA table_info(price_rollups)")}
+            if rollups_exist and "amount" not in rollup_cols:
+                # Bảng tổng hợp tạo trước khi có cột thành tiền: tạo lại
+                cursor.execute("ALTER TABLE price_rollups ADD COLUMN amount REAL")
+                rollups_exist = None
+            if not rollups_exist:
+                # Database cũ đã có dữ liệu: tính tổng hợp một lần
+                for table_name in TABLE_SCHEMAS:
+                    self._refresh_rollups(conn, table_name)
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _ensure_typed_columns(self, conn: sqlite3.Connection, table_name: str):
+        """Thêm các cột sinh kiểu chuẩn (số/ngày) còn thiếu vào bảng."""
+        existing = {
+            row[1] for row in conn.execute(f"PRAGMA table_xinfo({table_name})")
+        }
+        for col_name, _ in TABLE_SCHEMAS[table_name]:
+            typed_sql = _typed_column_sql(col_name)
+            if typed_sql and sort_key_column(col_name) not in existing:
+                conn.execute(f"ALTER TABLE {table_name} ADD COLUMN {typed_sql}")
+
+    def _ensure_sort_indexes(self, conn: sqlite3.Connection, table_name: str):
+        """Index theo khóa sắp xếp của từng cột.
+
+        Index (khóa, rowid) cho phép ORDER BY khóa, id ... LIMIT trả trang đầu
+        bằng cách duyệt index, không phải sort cả tập kết quả (temp B-tree).
+        """
+        for col_name, _ in TABLE_SCHEMAS[table_name]:
+            key = sort_key_column(col_name)
+            conn.execute(
+                f"CREATE INDEX IF NOT EXISTS idx_{table_name}_{key} "
+                f"ON {table_name} ({key})"
+            )
+
+    def _ensure_search_index(self, conn: sqlite3.Connection, table_name: str):
+        """Tạo bảng FTS5 trigram chứa bản không dấu + trigger đồng bộ.
+
+        Bản không dấu được tính một lần lúc ghi (trigger gọi fold_vn),
+        khi tìm kiếm chỉ cần LIKE/MATCH trên index trigram.
+        """
+        fts = _fts_table(table_name)
+        col_names = [col_name for col_name, _ in TABLE_SCHEMAS[table_name]]
+        cols = ", ".join(col_names)
+        folded_new = ", ".join(f"fold_vn(NEW.{c})" for c in col_names)
+
+        exists = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = ?", (fts,)
+        ).fetchone()
+        if not exists:
+            conn.execute(
+                f"CREATE VIRTUAL TABLE {fts} USING fts5({cols}, tokenize='trigram')"
+            )
+            # Database cũ đã có dữ liệu: tính bản không dấu cho các dòng hiện có
+            folded_cols = ", ".join(f"fold_vn({c})" for c in col_names)
+            conn.execute(
+                f"INSERT INTO {fts} (rowid, {cols}) "
+                f"SELECT id, {folded_cols} FROM {table_name}"
+            )
+
+        conn.execute(
+            f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table_name} BEGIN "
+            f"INSERT INTO {fts} (rowid, {cols}) VALUES (NEW.id, {folded_new}); END"
+        )
+        conn.execute(
+            f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table_name} BEGIN "
+            f"DELETE FROM {fts} WHERE rowid = OLD.id; END"
+        )
+        conn.execute(
+            f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE ON {table_name} BEGIN "
+            f"DELETE FROM {fts} WHERE rowid = OLD.id; "
+            f"INSERT INTO {fts} (rowid, {cols}) VALUES (NEW.id, {folded_new}); END"
+        )
+
+    def _refresh_fuzzy_index(self, conn: sqlite3.Connection, table_name: str):
+        """Đồng bộ posting list trigram với các giá trị distinct hiện có.
+
+        Chỉ thêm tên mới / xóa tên không còn, nên gọi sau mỗi lần ghi dữ liệu.
+        """
+        for col_name in FUZZY_COLUMNS.get(table_name, []):
+            current = {
+                row[0] for row in conn.execute(
+                    f"SELECT DISTINCT {col_name} FROM {table_name} "
+                    f"WHERE {col_name} IS NOT NULL AND {col_name} != ''"
+                )
+            }
+            existing = dict(conn.execute(
+                "SELECT term, term_id FROM fuzzy_terms "
+                "WHERE table_name = ? AND col_name = ?",
+                (table_name, col_name)
+            ).fetchall())
+
+            removed = [(existing[term],) for term in existing.keys() - current]
+            if removed:
+                conn.executemany("DELETE FROM fuzzy_grams WHERE term_id = ?", removed)
+                conn.executemany("DELETE FROM fuzzy_terms WHERE term_id = ?", removed)
+
+            for term in current - existing.keys():
+                grams = trigrams(term)
+                if not grams:
+                    continue
+                cursor = conn.execute(
+                    "INSERT INTO fuzzy_terms (table_name, col_name, term, gram_count) "
+                    "VALUES (?, ?, ?, ?)",
+                    (table_name, col_name, term, len(grams))
+                )
+                term_id = cursor.lastrowid
+                conn.executemany(
+                    "INSERT INTO fuzzy_grams (gram, term_id) VALUES (?, ?)",
+                    [(gram, term_id) for gram in grams]
+                )
+
+    def _refresh_rollups(self, conn: sqlite3.Connection, table_name: str,
+                         drug_keys: Optional[set] = None):
+        """Tính lại bảng tổng hợp giá theo tháng/quý của bảng.
+
+        drug_keys: chỉ tính lại các khóa thuốc này (khi ghi thêm một phần dữ
+        liệu); None = toàn bộ bảng. Gọi trong cùng transaction với lệnh ghi.
+        """
+        name_col = DRUG_KEY_COLUMNS.get(table_name)
+        if name_col is None:
+            return
+        price_key = sort_key_column(price_column(table_name))
+        date_col = date_column(table_name)
+
+        volume_sql, amount_sql = _weighted_sql(table_name)
+
+        # (khóa, tháng) -> [tên hiển thị, giá..., sản lượng, thành tiền]
+        months: Dict[Tuple[str, str], list] = {}
+        cursor = conn.execute(
+            f"SELECT {name_col}, {date_col}, {price_key}, {volume_sql}, {amount_sql} "
+            f"FROM {table_name} WHERE {price_key} IS NOT NULL AND {name_col} != ''"
+        )
+        for name, date_value, price, quantity, amount in cursor:
+            key = fold_text(name)
+            if not key or (drug_keys is not None and key not in drug_keys):
+                continue
+            month = rollup_period(date_value, "month")
+            if month is None:
+                continue
+            bucket = months.get((key, month))
+            if bucket is None:
+                bucket = months[(key, month)] = [name.strip(), [], 0, 0]
+            bucket[1].append(price)
+            if quantity:
+                bucket[2] += quantity
+                bucket[3] += amount
+
+        # Quý = gộp 3 tháng (median tính lại trên toàn bộ giá của quý)
+        quarters: Dict[Tuple[str, str], list] = {}
+        for (key, month), (name, prices, volume, amount) in months.items():
+            quarter = rollup_period(f"{month}-01", "quarter")
+            bucket = quarters.setdefault((key, quarter), [name, [], 0, 0])
+            bucket[1].extend(prices)
+            bucket[2] += volume
+            bucket[3] += amount
+
+        if drug_keys is None:
+            conn.execute("DELETE FROM price_rollups WHERE table_name = ?", (table_name,))
+        else:
+            conn.executemany(
+                "DELETE FROM price_rollups WHERE table_name = ? AND period_type = ? "
+                "AND drug_key = ?",
+                [(table_name, period_type, key)
+                 for period_type in ROLLUP_PERIODS for key in drug_keys]
+            )
+
+        def rows(period_type, buckets):
+            for (key, period), (name, prices, volume, amount) in buckets.items():
+                prices.sort()
+                n = len(prices)
+                median = prices[n // 2] if n % 2 else (prices[n // 2 - 1] + prices[n // 2]) / 2
+                yield (table_name, key, period_type, period, name, n, prices[0], median,
+                       prices[-1], sum(prices) / n, volume, amount)
+
+        insert_sql = (
+            "INSERT INTO price_rollups (table_name, drug_key, period_type, period, drug_name, "
+            "count, min_price, median_price, max_price, mean_price, volume, amount) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+        )
+        conn.executemany(insert_sql, rows("month", months))
+        conn.executemany(insert_sql, rows("quarter", quarters))
+
+    def refresh_rollups(self, table_name: str, drug_keys: Optional[set] = None):
+        """Tính lại bảng tổng hợp giá theo kỳ (khi dữ liệu được ghi từ bên ngoài)."""
+        if table_name not in TABLE_SCHEMAS:
+            raise ValueError(f"Bảng '{table_name}' không tồn tại")
+        conn = self._get_connection()
+        try:
+            self._refresh_rollups(conn, table_name, drug_keys)
+            conn.commit()
+        finally:
+            conn.close()
+
+    def refresh_fuzzy_index(self, table_name: str):
+        """Cập nhật index gần đúng (dùng khi dữ liệu được ghi từ bên ngoài)."""
+        if table_name not in TABLE_SCHEMAS:
+            raise ValueError(f"Bảng '{table_name}' không tồn tại")
+        conn = self._get_connection()
+        try:
+            self._refresh_fuzzy_index(conn, table_name)
             conn.commit()
         finally:
             conn.close()
 
+    def _fuzzy_match_terms(self, conn: sqlite3.Connection, table_name: str,
+                           keyword: str, search_column: Optional[str] = None
+                           ) -> List[Tuple[str, str]]:
+        """Tìm các tên gần đúng với từ khóa, xếp theo độ tương đồng giảm dần.
+
+        Điểm = số trigram chung / số trigram của từ khóa; hòa điểm thì ưu tiên
+        Jaccard cao hơn (tên ngắn, sát từ khóa hơn).
+        Returns: list of (col_name, term).
+        """
+        fuzzy_cols = FUZZY_COLUMNS.get(table_name, [])
+        if search_column:
+            fuzzy_cols = [c for c in fuzzy_cols if c == search_column]
+        grams = trigrams(keyword)
+        if not fuzzy_cols or not grams:
+            return []
+
+        # Lần đầu dùng trên database cũ: dựng index từ dữ liệu hiện có
+        has_terms = conn.execute(
+            "SELECT 1 FROM fuzzy_terms WHERE table_name = ? LIMIT 1", (table_name,)
+        ).fetchone()
+        if not has_terms:
+            self._refresh_fuzzy_index(conn, table_name)
+            conn.commit()
+
+        gram_placeholders = ", ".join(["?"] * len(grams))
+        col_placeholders = ", ".join(["?"] * len(fuzzy_cols))
+        n = len(grams)
+        # CROSS JOIN giữ thứ tự: duyệt posting theo gram trước rồi mới tra term
+        sql = f"""
+            SELECT t.col_name, t.term,
+                   COUNT(*) * 1.0 / ? AS score,
+                   COUNT(*) * 1.0 / (? + t.gram_count - COUNT(*)) AS similarity
+            FROM fuzzy_grams g
+            CROSS JOIN fuzzy_terms t ON t.term_id = g.term_id
+            WHERE g.gram IN ({gram_placeholders})
+              AND t.table_name = ?
+              AND t.col_name IN ({col_placeholders})
+            GROUP BY g.term_id
+            HAVING score >= ?
+            ORDER BY score DESC, similarity DESC
+            LIMIT ?
+        """
+        params: List[object] = [n, n, *grams, table_name, *fuzzy_cols,
+                                self.fuzzy_threshold, FUZZY_MAX_TERMS]
+        return [(row[0], row[1]) for row in conn.execute(sql, params)]
+
+    def _bump_data_version(self, conn: sqlite3.Connection, table_name: str):
+        """Đánh dấu dữ liệu bảng đã đổi (cùng transaction với thao tác ghi)."""
+        conn.execute(
+            "INSERT INTO data_versions (table_name, version) VALUES (?, 1) "
+            "ON CONFLICT(table_name) DO UPDATE SET version = version + 1",
+            (table_name,)
+        )
+
+    def get_data_version(self, table_name: str) -> int:
+        """Phiên bản dữ liệu hiện tại của bảng (dùng để làm mới cache)."""
+        conn = self._get_connection()
+        try:
+            row = conn.execute(
+                "SELECT version FROM data_versions WHERE table_name = ?", (table_name,)
+            ).fetchone()
+            return row[0] if row else 0
+        finally:
+            conn.close()
+
+    @property
+    def analytics(self):
+        """AnalyticsEngine (NumPy) hoặc None nếu chưa cài NumPy."""
+        if self._analytics is None:
+            from analytics import AnalyticsEngine
+            if not AnalyticsEngine.available():
+                return None
+            self._analytics = AnalyticsEngine(self)
+        return self._analytics
+
+    def _clear_table(self, conn: sqlite3.Connection, table_name: str):
+        """Xóa toàn bộ dòng của bảng (và index không dấu đi kèm)."""
+        # Xóa FTS trước để trigger AFTER DELETE không phải gỡ từng dòng
+        conn.execute(f"DELETE FROM {_fts_table(table_name)}")
+        conn.execute(f"DELETE FROM {table_name}")
+
     def import_from_excel(self, table_name: str, file_path: str,
                           sheet_name: Optional[str] = None) -> int:
         """Import dữ liệu từ file Excel vào bảng SQLite. Returns: số dòng đã import."""
@@ -247,6 +731,8 @@ class DatabaseManager:
         if columns is None:
             raise ValueError(f"Bảng '{table_name}' không tồn tại")
 
+        import pandas as pd  # type: ignore  # nạp khi import lần đầu, không ở lúc khởi động
+
         if file_path.endswith('.csv'):
             df = pd.read_csv(file_path, dtype=str)
         else:
@@ -260,12 +746,15 @@ class DatabaseManager:
 
         conn = self._get_connection()
         try:
-            conn.execute(f"DELETE FROM {table_name}")
+            self._clear_table(conn, table_name)
             placeholders = ", ".join(["?"] * num_cols)
             insert_cols = ", ".join(col_names[:num_cols])  # type: ignore
             sql = f"INSERT INTO {table_name} ({insert_cols}) VALUES ({placeholders})"
             rows = df_subset.values.tolist()
             conn.executemany(sql, rows)
+            self._refresh_fuzzy_index(conn, table_name)
+            self._refresh_rollups(conn, table_name)
+            self._bump_data_version(conn, table_name)
             conn.commit()
             return len(rows)
         finally:
@@ -285,48 +774,98 @@ class DatabaseManager:
         return []
 
 
-    def search_data(self, table_name: str, keyword: str,
-                    filters: Optional[list] = None,
-                    search_column: Optional[str] = None,
-                    date_filters: Optional[dict] = None,
-                    limit: Optional[int] = None,
-                    offset: Optional[int] = None,
-                    sort_column: Optional[str] = None,
-                    sort_order: str = 'ASC') -> list:
-        """Tìm kiếm dữ liệu trong bảng.
-        filters: list of (col_name, value)
-        date_filters: {'column': 'ngay_ban_hanh', 'start': 'dd/mm/yyyy', 'end': 'dd/mm/yyyy'}
-        limit: số lượng bản ghi trả về (None = all)
-        offset: vị trí bắt đầu
+    def _build_search_conditions(self, table_name: str, keyword: str,
+                                 filters=None,
+                                 search_column: Optional[str] = None,
+                                 date_filters: Optional[dict] = None,
+                                 search_mode: str = "contains",
+                                 fuzzy_matches: Optional[list] = None
+                                 ) -> Tuple[List[str], List[object]]:
+        """Dựng mệnh đề WHERE dùng chung cho search_data / count_search_data.
+        fuzzy_matches: kết quả _fuzzy_match_terms khi search_mode = "fuzzy"
         """
         columns = TABLE_SCHEMAS.get(table_name, [])
         col_names = [col_name for col_name, _ in columns]
-        select_cols = ", ".join(col_names)
 
         conditions: List[str] = []
         params: List[object] = []
 
-        if keyword and keyword.strip():
-            # Normalize keyword: remove spaces, lowercase for matching
-            clean_keyword = keyword.replace(" ", "").lower()
-            
-            if search_column and search_column in col_names:
-                conditions.append(f"LOWER(REPLACE({search_column}, ' ', '')) LIKE ?")
-                params.append(f"%{clean_keyword}%")
-            else:
-                keyword_conditions = []
-                for col_name in col_names:
-                    # Apply logic to all columns
-                    keyword_conditions.append(f"LOWER(REPLACE({col_name}, ' ', '')) LIKE ?")
-                    params.append(f"%{clean_keyword}%")
-                conditions.append(f"({' OR '.join(keyword_conditions)})")
-
         if filters:
             # Chuyen dict thanh list tuples neu can
             if isinstance(filters, dict):
-                filter_items = filters.items()
+                filter_items = list(filters.items())
             else:
-                filter_items = filters
+                filter_items = list(filters)
+        else:
+            filter_items = []
+
+        if search_mode == "fuzzy" and fuzzy_matches is not None:
+            # Từ khóa khớp theo danh sách tên gần đúng (dùng index trên cột tên)
+            by_col: Dict[str, List[str]] = {}
+            for col_name, term in fuzzy_matches:
+                by_col.setdefault(col_name, []).append(term)
+            if by_col:
+                keyword_conditions = []
+                for col_name, terms in by_col.items():
+                    keyword_conditions.append(
+                        f"{col_name} IN ({', '.join(['?'] * len(terms))})"
+                    )
+                    params.extend(terms)
+                conditions.append(f"({' OR '.join(keyword_conditions)})")
+            else:
+                conditions.append("0")
+            # Bộ lọc nâng cao vẫn tìm không dấu như chế độ "unaccent"
+            keyword = ""
+            search_mode = "unaccent"
+
+        if search_mode == "unaccent":
+            # Tìm trên bản không dấu đã tính sẵn trong bảng FTS
+            fts = _fts_table(table_name)
+            fts_conditions: List[str] = []
+            fts_params: List[object] = []
+
+            folded_keyword = fold_text(keyword) if keyword else ""
+            if folded_keyword:
+                if search_column and search_column in col_names:
+                    fts_conditions.append(f"{search_column} LIKE ?")
+                    fts_params.append(f"%{folded_keyword}%")
+                elif len(folded_keyword) >= 3:
+                    # Phrase trigram = chuỗi con trên mọi cột, dùng index
+                    fts_conditions.append(f"{fts} MATCH ?")
+                    fts_params.append(_fts_phrase(folded_keyword))
+                else:
+                    # Dưới 3 ký tự trigram không dùng được index
+                    keyword_conditions = []
+                    for col_name in col_names:
+                        keyword_conditions.append(f"{col_name} LIKE ?")
+                        fts_params.append(f"%{folded_keyword}%")
+                    fts_conditions.append(f"({' OR '.join(keyword_conditions)})")
+
+            for col_name, value in filter_items:
+                if value and value.strip() and col_name in col_names:
+                    fts_conditions.append(f"{col_name} LIKE ?")
+                    fts_params.append(f"%{fold_text(value)}%")
+
+            if fts_conditions:
+                conditions.append(
+                    f"id IN (SELECT rowid FROM {fts} WHERE {' AND '.join(fts_conditions)})"
+                )
+                params.extend(fts_params)
+        else:
+            if keyword and keyword.strip():
+                # Normalize keyword: remove spaces, lowercase for matching
+                clean_keyword = keyword.replace(" ", "").lower()
+
+                if search_column and search_column in col_names:
+                    conditions.append(f"LOWER(REPLACE({search_column}, ' ', '')) LIKE ?")
+                    params.append(f"%{clean_keyword}%")
+                else:
+                    keyword_conditions = []
+                    for col_name in col_names:
+                        # Apply logic to all columns
+                        keyword_conditions.append(f"LOWER(REPLACE({col_name}, ' ', '')) LIKE ?")
+                        params.append(f"%{clean_keyword}%")
+                    conditions.append(f"({' OR '.join(keyword_conditions)})")
 
             for col_name, value in filter_items:
                 if value and value.strip() and col_name in col_names:
@@ -334,22 +873,23 @@ class DatabaseManager:
                     clean_val = value.replace(" ", "").lower()
                     conditions.append(f"LOWER(REPLACE({col_name}, ' ', '')) LIKE ?")
                     params.append(f"%{clean_val}%")
-        
+
         # Date Filter Logic
         if date_filters:
             col = date_filters.get('column')
             start = date_filters.get('start') # dd/mm/yyyy
             end = date_filters.get('end')     # dd/mm/yyyy
-            
+
             if col and col in col_names and (start or end):
-                # Convert stored DD/MM/YYYY to YYYY-MM-DD for comparison
-                # Note: substr in sqlite is 1-based index
-                # dd/mm/yyyy -> substr(col,7,4)||'-'||substr(col,4,2)||'-'||substr(col,1,2)
-                
-                parts = []
-                # Ensure column has enough length (10 chars) before trying to substring
-                date_sql = f"(length({col}) >= 10 AND substr({col},7,4) || '-' || substr({col},4,2) || '-' || substr({col},1,2)"
-                
+                if col in DATE_COLUMNS:
+                    # Cột sinh yyyy-mm-dd có index -> lọc theo khoảng
+                    date_sql = f"({sort_key_column(col)}"
+                else:
+                    # Convert stored DD/MM/YYYY to YYYY-MM-DD for comparison
+                    # Note: substr in sqlite is 1-based index
+                    # Ensure column has enough length (10 chars) before trying to substring
+                    date_sql = f"(length({col}) >= 10 AND substr({col},7,4) || '-' || substr({col},4,2) || '-' || substr({col},1,2)"
+
                 if start:
                     # Convert input start dd/mm/yyyy -> yyyy-mm-dd
                     try:
@@ -359,7 +899,7 @@ class DatabaseManager:
                         params.append(start_iso)
                     except ValueError:
                         pass # Ignore invalid date format inputs
-                        
+
                 if end:
                     try:
                         d, m, y = end.split('/')
@@ -369,42 +909,129 @@ class DatabaseManager:
                     except ValueError:
                         pass
 
-        sql = f"SELECT id, {select_cols} FROM {table_name}"
-        if conditions:
-            sql += " WHERE " + " AND ".join(conditions)
-
-        if sort_column and sort_column in col_names:
-            # Validate sort_order
-            order = 'DESC' if sort_order.upper() == 'DESC' else 'ASC'
-            
-            # Numeric columns that need integer sorting
-            # 'stt' is definitely numeric
-            if sort_column == 'stt':
-                sql += f" ORDER BY CAST({sort_column} AS INTEGER) {order}"
-            else:
-                sql += f" ORDER BY {sort_column} {order}"
-        else:
-            # Default sort (e.g. by id desc or whatever makes sense, maybe specific logic per table?)
-            # For now, let's default to id DESC if no sort, or just no order (which means insertion order usually)
-            # Actually, consistent order is good for pagination.
-            sql += " ORDER BY id ASC"
-
+        return conditions, params
 
-        if limit is not None:
-            sql += " LIMIT ?"
-            params.append(limit)
-            if offset is not None:
-                sql += " OFFSET ?"
-                params.append(offset)
+    def search_data(self, table_name: str, keyword: str,
+                    filters: Optional[list] = None,
+                    search_column: Optional[str] = None,
+                    date_filters: Optional[dict] = None,
+                    limit: Optional[int] = None,
+                    offset: Optional[int] = None,
+                    sort_column: Optional[str] = None,
+                    sort_order: str = 'ASC',
+                    search_mode: str = "contains") -> list:
+        """Tìm kiếm dữ liệu trong bảng.
+        filters: list of (col_name, value)
+        date_filters: {'column': 'ngay_ban_hanh', 'start': 'dd/mm/yyyy', 'end': 'dd/mm/yyyy'}
+        limit: số lượng bản ghi trả về (None = all)
+        offset: vị trí bắt đầu
+        search_mode: "contains" (có dấu), "unaccent" (không dấu) hoặc
+                     "fuzzy" (gần đúng, mặc định xếp theo độ tương đồng)
+        """
+        started = time.perf_counter()
+        columns = TABLE_SCHEMAS.get(table_name, [])
+        col_names = [col_name for col_name, _ in columns]
+        select_cols = ", ".join(col_names)
 
         conn = self._get_connection()
         try:
-            cursor = conn.execute(sql, params)
-            return cursor.fetchall()
+            fuzzy_matches = self._resolve_fuzzy(
+                conn, table_name, keyword, search_column, search_mode
+            )
+            if fuzzy_matches is None and search_mode == "fuzzy":
+                search_mode = "unaccent"
+            conditions, params = self._build_search_conditions(
+                table_name, keyword, filters, search_column, date_filters,
+                search_mode, fuzzy_matches
+            )
+
+            sql = f"SELECT id, {select_cols} FROM {table_name}"
+            if conditions:
+                sql += " WHERE " + " AND ".join(conditions)
+
+            sql += self._order_by_clause(
+                col_names, sort_column, sort_order, fuzzy_matches, params
+            )
+
+            if limit is not None:
+                sql += " LIMIT ?"
+                params.append(limit)
+                if offset is not None:
+                    sql += " OFFSET ?"
+                    params.append(offset)
+
+            rows = conn.execute(sql, params).fetchall()
+            self.profiler.record(
+                self._query_shape("search_data", table_name, keyword, filters,
+                                  search_column, date_filters, search_mode, sort_column),
+                started, conn, sql, params
+            )
+            return rows
         finally:
             conn.close()
         return []
 
+    @staticmethod
+    def _query_shape(operation: str, table_name: str, keyword: str, filters,
+                     search_column: Optional[str], date_filters: Optional[dict],
+                     search_mode: str, sort_column: Optional[str] = None) -> str:
+        """Nhãn "dạng truy vấn" để gom thống kê (không chứa giá trị cụ thể)."""
+        parts = [operation, table_name, search_mode]
+        if keyword and keyword.strip():
+            parts.append(f"kw={search_column or 'all'}")
+        if filters:
+            parts.append(f"filters={len(filters)}")
+        if date_filters:
+            parts.append("date")
+        if sort_column:
+            parts.append(f"sort={sort_column}")
+        return " ".join(parts)
+
+    def _resolve_fuzzy(self, conn: sqlite3.Connection, table_name: str,
+                       keyword: str, search_column: Optional[str],
+                       search_mode: str) -> Optional[list]:
+        """Danh sách tên gần đúng cho chế độ "fuzzy".
+
+        Trả None nếu không áp dụng được (từ khóa < 3 ký tự, cột không có index
+        trigram) để gọi hàm chuyển sang tìm không dấu.
+        """
+        if search_mode != "fuzzy" or len(fold_text(keyword)) < 3:
+            return None
+        if search_column and search_column not in FUZZY_COLUMNS.get(table_name, []):
+            return None
+        return self._fuzzy_match_terms(conn, table_name, keyword, search_column)
+
+    def _order_by_clause(self, col_names: List[str], sort_column: Optional[str],
+                         sort_order: str, fuzzy_matches: Optional[list],
+                         params: List[object]) -> str:
+        """Mệnh đề ORDER BY (thêm tham số vào params nếu cần)."""
+        if sort_column and sort_column in col_names:
+            # Validate sort_order
+            order = 'DESC' if sort_order.upper() == 'DESC' else 'ASC'
+
+            # Cột số/ngày sắp theo cột sinh kiểu chuẩn; id cùng chiều để
+            # phân trang ổn định và vẫn duyệt được index (khóa, rowid)
+            key = sort_key_column(sort_column)
+            return f" ORDER BY {key} {order}, id {order}"
+
+        if fuzzy_matches:
+            # Xếp theo thứ hạng tên gần đúng (tên khớp tốt nhất lên đầu)
+            by_col: Dict[str, List[str]] = {}
+            for col_name, term in fuzzy_matches:
+                by_col.setdefault(col_name, []).append(term)
+            rank_of = {match: len(fuzzy_matches) - i for i, match in enumerate(fuzzy_matches)}
+            cases = []
+            for col_name, terms in by_col.items():
+                whens = " ".join("WHEN ? THEN ?" for _ in terms)
+                cases.append(f"CASE {col_name} {whens} ELSE 0 END")
+                for term in terms:
+                    params.extend([term, rank_of[(col_name, term)]])
+            rank_sql = cases[0] if len(cases) == 1 else f"max({', '.join(cases)})"
+            return f" ORDER BY {rank_sql} DESC, id ASC"
+
+        # Consistent order is good for pagination.
+        return " ORDER BY id ASC"
+
     def get_data_by_ids(self, table_name: str, ids: list) -> list:
         """Lấy dữ liệu theo danh sách IP."""
         if not ids:
@@ -427,87 +1054,141 @@ class DatabaseManager:
     def count_search_data(self, table_name: str, keyword: str,
                           filters: Optional[list] = None,
                           search_column: Optional[str] = None,
-                          date_filters: Optional[dict] = None) -> int:
+                          date_filters: Optional[dict] = None,
+                          search_mode: str = "contains") -> int:
         """Đếm số kết quả tìm kiếm (không apply paginaton)."""
-        columns = TABLE_SCHEMAS.get(table_name, [])
-        col_names = [col_name for col_name, _ in columns]
+        started = time.perf_counter()
+        conn = self._get_connection()
+        try:
+            fuzzy_matches = self._resolve_fuzzy(
+                conn, table_name, keyword, search_column, search_mode
+            )
+            if fuzzy_matches is None and search_mode == "fuzzy":
+                search_mode = "unaccent"
+            conditions, params = self._build_search_conditions(
+                table_name, keyword, filters, search_column, date_filters,
+                search_mode, fuzzy_matches
+            )
 
-        conditions = []
-        params = []
+            sql = f"SELECT COUNT(*) FROM {table_name}"
+            if conditions:
+                sql += " WHERE " + " AND ".join(conditions)
 
-        if keyword and keyword.strip():
-            clean_keyword = keyword.replace(" ", "").lower()
-            
-            if search_column and search_column in col_names:
-                conditions.append(f"LOWER(REPLACE({search_column}, ' ', '')) LIKE ?")
-                params.append(f"%{clean_keyword}%")
-            else:
-                keyword_conditions = []
-                for col_name in col_names:
-                    keyword_conditions.append(f"LOWER(REPLACE({col_name}, ' ', '')) LIKE ?")
-                    params.append(f"%{clean_keyword}%")
-                conditions.append(f"({' OR '.join(keyword_conditions)})")
+            count = conn.execute(sql, params).fetchone()[0]
+            self.profiler.record(
+                self._query_shape("count_search_data", table_name, keyword, filters,
+                                  search_column, date_filters, search_mode),
+                started, conn, sql, params
+            )
+            return count
+        finally:
+            conn.close()
+        return 0
 
-        if filters:
-            if isinstance(filters, dict):
-                filter_items = filters.items()
-            else:
-                filter_items = filters
+    def search_ids(self, table_name: str, keyword: str,
+                   filters: Optional[list] = None,
+                   search_column: Optional[str] = None,
+                   date_filters: Optional[dict] = None,
+                   search_mode: str = "contains") -> List[int]:
+        """Id của mọi kết quả tìm kiếm (tăng dần), để thống kê trên toàn bộ kết quả."""
+        started = time.perf_counter()
+        conn = self._get_connection()
+        try:
+            fuzzy_matches = self._resolve_fuzzy(
+                conn, table_name, keyword, search_column, search_mode
+            )
+            if fuzzy_matches is None and search_mode == "fuzzy":
+                search_mode = "unaccent"
+            conditions, params = self._build_search_conditions(
+                table_name, keyword, filters, search_column, date_filters,
+                search_mode, fuzzy_matches
+            )
 
-            for col_name, value in filter_items:
-                if value and value.strip() and col_name in col_names:
-                    clean_val = value.replace(" ", "").lower()
-                    conditions.append(f"LOWER(REPLACE({col_name}, ' ', '')) LIKE ?")
-                    params.append(f"%{clean_val}%")
+            sql = f"SELECT id FROM {table_name}"
+            if conditions:
+                sql += " WHERE " + " AND ".join(conditions)
+            sql += " ORDER BY id"
 
-        if date_filters:
-            col = date_filters.get('column')
-            start = date_filters.get('start')
-            end = date_filters.get('end')
-            
-            if col and col in col_names and (start or end):
-                date_sql = f"(length({col}) >= 10 AND substr({col},7,4) || '-' || substr({col},4,2) || '-' || substr({col},1,2)"
-                
-                if start:
-                    try:
-                        d, m, y = start.split('/')
-                        start_iso = f"{y}-{m}-{d}"
-                        conditions.append(f"{date_sql} >= ?)")
-                        params.append(start_iso)
-                    except ValueError:
-                        pass
-                        
-                if end:
-                    try:
-                        d, m, y = end.split('/')
-                        end_iso = f"{y}-{m}-{d}"
-                        conditions.append(f"{date_sql} <= ?)")
-                        params.append(end_iso)
-                    except ValueError:
-                        pass
+            ids = [row[0] for row in conn.execute(sql, params)]
+            self.profiler.record(
+                self._query_shape("search_ids", table_name, keyword, filters,
+                                  search_column, date_filters, search_mode),
+                started, conn, sql, params
+            )
+            return ids
+        finally:
+            conn.close()
+        return []
 
-        sql = f"SELECT COUNT(*) FROM {table_name}"
-        if conditions:
-            sql += " WHERE " + " AND ".join(conditions)
+    def get_price_summary(self, table_name: str, keyword: str,
+                          filters: Optional[list] = None,
+                          search_column: Optional[str] = None,
+                          date_filters: Optional[dict] = None,
+                          search_mode: str = "contains") -> dict:
+        """Thống kê giá trên toàn bộ kết quả tìm kiếm, tính bằng SQL trên cột
+        đã ép kiểu (dùng khi không có AnalyticsEngine).
 
+        Returns: {'count', 'min', 'max', 'mean', 'median', 'weighted_mean', 'volume'}
+        """
+        started = time.perf_counter()
+        price_key = sort_key_column(price_column(table_name))
+        volume_sql, amount_sql = _weighted_sql(table_name)
         conn = self._get_connection()
         try:
-            cursor = conn.execute(sql, params)
-            return cursor.fetchone()[0]
+            fuzzy_matches = self._resolve_fuzzy(
+                conn, table_name, keyword, search_column, search_mode
+            )
+            if fuzzy_matches is None and search_mode == "fuzzy":
+                search_mode = "unaccent"
+            conditions, params = self._build_search_conditions(
+                table_name, keyword, filters, search_column, date_filters,
+                search_mode, fuzzy_matches
+            )
+            where = " WHERE " + " AND ".join(conditions) if conditions else ""
+
+            sql = (
+                f"SELECT COUNT({price_key}), MIN({price_key}), MAX({price_key}), "
+                f"AVG({price_key}), SUM({volume_sql}), SUM({amount_sql}) "
+                f"FROM {table_name}{where}"
+            )
+            count, p_min, p_max, p_mean, volume, amount = conn.execute(sql, params).fetchone()
+            median = 0
+            if count:
+                # Trung vị: 1-2 giá ở giữa, duyệt theo index của cột giá
+                priced = where + (" AND " if where else " WHERE ") + f"{price_key} IS NOT NULL"
+                middle = [row[0] for row in conn.execute(
+                    f"SELECT {price_key} FROM {table_name}{priced} ORDER BY {price_key} "
+                    f"LIMIT ? OFFSET ?", [*params, 2 - count % 2, (count - 1) // 2]
+                )]
+                median = sum(middle) / len(middle)
+            self.profiler.record(
+                self._query_shape("get_price_summary", table_name, keyword, filters,
+                                  search_column, date_filters, search_mode),
+                started, conn, sql, params
+            )
+            return {
+                "count": count, "min": p_min or 0, "max": p_max or 0, "mean": p_mean or 0,
+                "median": median, "volume": volume or 0,
+                "weighted_mean": _weighted_mean(volume, amount),
+            }
         finally:
             conn.close()
-        return 0
 
     def get_distinct_values(self, table_name: str, column_name: str) -> list:
         """Lấy danh sách giá trị distinct của 1 cột (cho ComboBox filter)."""
+        started = time.perf_counter()
         conn = self._get_connection()
         try:
-            cursor = conn.execute(
+            sql = (
                 f"SELECT DISTINCT {column_name} FROM {table_name} "
                 f"WHERE {column_name} IS NOT NULL AND {column_name} != '' "
                 f"ORDER BY {column_name}"
             )
-            return [row[0] for row in cursor.fetchall()]
+            values = [row[0] for row in conn.execute(sql).fetchall()]
+            self.profiler.record(
+                f"get_distinct_values {table_name} {column_name}", started, conn, sql
+            )
+            return values
         finally:
             conn.close()
         return []
@@ -526,7 +1207,10 @@ class DatabaseManager:
         """Xóa toàn bộ dữ liệu trong bảng."""
         conn = self._get_connection()
         try:
-            conn.execute(f"DELETE FROM {table_name}")
+            self._clear_table(conn, table_name)
+            self._refresh_fuzzy_index(conn, table_name)
+            self._refresh_rollups(conn, table_name)
+            self._bump_data_version(conn, table_name)
             conn.commit()
         finally:
             conn.close()
@@ -540,12 +1224,15 @@ class DatabaseManager:
         col_names = [col_name for col_name, _ in columns]
         conn = self._get_connection()
         try:
-            conn.execute(f"DELETE FROM {table_name}")
+            self._clear_table(conn, table_name)
             if rows:
                 placeholders = ", ".join(["?"] * len(col_names))
                 insert_cols = ", ".join(col_names)
                 sql = f"INSERT INTO {table_name} ({insert_cols}) VALUES ({placeholders})"
                 conn.executemany(sql, rows)
+            self._refresh_fuzzy_index(conn, table_name)
+            self._refresh_rollups(conn, table_name)
+            self._bump_data_version(conn, table_name)
             conn.commit()
         finally:
             conn.close()
@@ -557,6 +1244,8 @@ class DatabaseManager:
         if data is None:
             data = self.get_all_data(table_name)
 
+        import pandas as pd  # type: ignore
+
         df = pd.DataFrame(data, columns=headers)
         if file_path.endswith('.csv'):
             df.to_csv(file_path, index=False, encoding='utf-8-sig')
@@ -567,7 +1256,9 @@ class DatabaseManager:
         """
         Lấy thống kê giá (Min, Max, Count) dựa trên tiêu chí search chính xác.
         criteria: dictionary {column_name: value}
+        Kèm 'volume' (tổng số lượng) và 'weighted_mean' (giá BQ gia quyền).
         """
+        started = time.perf_counter()
         columns = TABLE_SCHEMAS.get(table_name)
         if not columns:
             return {'min': 0, 'max': 0, 'count': 0}
@@ -590,18 +1281,16 @@ class DatabaseManager:
         where_clause = " AND ".join(conditions)
         
         # Determine price column based on table
-        # Default 'don_gia' for drugs, 'don_gia_trung_thau' for herbal/others
-        price_col = 'don_gia'
-        if 'don_gia_trung_thau' in col_names:
-            price_col = 'don_gia_trung_thau'
-        elif 'gia' in col_names:
-            price_col = 'gia'
+        price_col = price_column(table_name)
+        volume_sql, amount_sql = _weighted_sql(table_name)
             
         sql = f"""
             SELECT 
                 MIN(CAST(REPLACE(REPLACE({price_col}, ',', ''), '.', '') AS INTEGER)),
                 MAX(CAST(REPLACE(REPLACE({price_col}, ',', ''), '.', '') AS INTEGER)),
-                COUNT(*)
+                COUNT(*),
+                SUM({volume_sql}),
+                SUM({amount_sql})
             FROM {table_name}
             WHERE {where_clause}
         """
@@ -615,10 +1304,187 @@ class DatabaseManager:
                 result = {
                     'min': row[0] or 0,
                     'max': row[1] or 0,
-                    'count': row[2] or 0
+                    'count': row[2] or 0,
+                    'volume': row[3] or 0,
+                    'weighted_mean': _weighted_mean(row[3], row[4])
                 }
+            self.profiler.record(
+                f"get_price_statistics {table_name} by={','.join(sorted(criteria))}",
+                started, conn, sql, params
+            )
         except Exception:
              pass
         finally:
             conn.close()
         return result
+
+    def get_price_distributions(self, table_name: str, criteria_list: List[dict],
+                                reference_prices: Optional[List[Optional[float]]] = None,
+                                bins: int = 10) -> List[dict]:
+        """
+        Phân bố giá (percentile, ngưỡng ngoại lai IQR, histogram) cho cả
+        danh sách tiêu chí - vd. mọi dòng của kế hoạch LCNT - trong một lượt.
+
+        criteria_list: mỗi phần tử là {column_name: value} như get_price_statistics
+        reference_prices: giá tham khảo từng dòng (để tính vị trí / cờ ngoại lai)
+        Returns: list dict (xem analytics.price_distribution) theo đúng thứ tự,
+        kèm 'volume' và 'weighted_mean' (giá BQ gia quyền).
+        """
+        from analytics import normalize_key, price_distribution
+
+        started = time.perf_counter()
+        columns = TABLE_SCHEMAS.get(table_name)
+        if not columns:
+            return [dict(price_distribution([]), volume=0, weighted_mean=0)
+                    for _ in criteria_list]
+        col_names = {c[0] for c in columns}
+
+        # Gom các dòng dùng cùng bộ cột -> mỗi bộ cột chỉ một lượt đọc giá
+        line_keys: List[Optional[tuple]] = []
+        groups: Dict[tuple, List[int]] = {}
+        for i, criteria in enumerate(criteria_list):
+            used = sorted(
+                (col, normalize_key(val)) for col, val in criteria.items()
+                if col in col_names and normalize_key(val)
+            )
+            if not used:
+                line_keys.append(None)
+                continue
+            line_keys.append(tuple(value for _, value in used))
+            groups.setdefault(tuple(col for col, _ in used), []).append(i)
+
+        # Mỗi dòng: (giá đã sắp, tổng số lượng, tổng thành tiền)
+        found_lines: List[tuple] = [([], 0, 0)] * len(criteria_list)
+        engine = self.analytics
+        for group_cols, indexes in groups.items():
+            keys = [line_keys[i] for i in indexes]
+            found = engine.prices_by_key(table_name, group_cols, keys) if engine else None
+            if found is None:
+                found = self._prices_by_key_sql(table_name, group_cols, keys)
+            for i, line in zip(indexes, found):
+                found_lines[i] = line
+
+        references = reference_prices or [None] * len(criteria_list)
+        results = [
+            dict(price_distribution(values, reference, bins),
+                 volume=volume, weighted_mean=_weighted_mean(volume, amount))
+            for (values, volume, amount), reference in zip(found_lines, references)
+        ]
+        self.profiler.record(
+            f"get_price_distributions {table_name} groups={len(groups)}", started
+        )
+        return results
+
+    def _prices_by_key_sql(self, table_name: str, columns: tuple,
+                           key_values: List[tuple]) -> List[list]:
+        """Đường SQL của get_price_distributions: một lần quét bảng, nối với
+        bảng tạm chứa các bộ khóa, sắp theo (khóa, giá).
+        Returns: [(giá đã sắp, tổng số lượng, tổng thành tiền)] theo key_values."""
+        price_key = sort_key_column(price_column(table_name))
+        volume_sql, amount_sql = _weighted_sql(table_name)
+        key_cols = [f"k{i}" for i in range(len(columns))]
+        conn = self._get_connection()
+        try:
+            conn.execute(
+                f"CREATE TEMP TABLE dist_keys ({', '.join(key_cols)}, "
+                f"PRIMARY KEY ({', '.join(key_cols)})) WITHOUT ROWID"
+            )
+            conn.executemany(
+                f"INSERT OR IGNORE INTO dist_keys VALUES ({', '.join('?' * len(columns))})",
+                key_values
+            )
+            # CROSS JOIN giữ bảng dữ liệu ở vòng ngoài: quét một lần, tra khóa theo PK
+            join = " AND ".join(
+                f"k.{key} = LOWER(TRIM(t.{col}))" for key, col in zip(key_cols, columns)
+            )
+            sql = (
+                f"SELECT {', '.join('k.' + key for key in key_cols)}, "
+                f"{volume_sql}, {amount_sql}, t.{price_key} "
+                f"FROM {table_name} t CROSS JOIN dist_keys k ON {join} "
+                f"WHERE t.{price_key} IS NOT NULL "
+                f"ORDER BY {', '.join('k.' + key for key in key_cols)}, t.{price_key}"
+            )
+            by_key: Dict[tuple, list] = {}
+            width = len(key_cols)
+            for row in conn.execute(sql):
+                line = by_key.get(row[:width])
+                if line is None:
+                    line = by_key[row[:width]] = [[], 0, 0]
+                line[0].append(row[-1])
+                if row[width]:
+                    line[1] += row[width]
+                    line[2] += row[width + 1]
+            return [tuple(by_key.get(tuple(values), ([], 0, 0))) for values in key_values]
+        finally:
+            conn.close()
+
+    def get_price_trend(self, table_name: str, drug: str, period_type: str = "month",
+                        start: Optional[str] = None, end: Optional[str] = None) -> List[dict]:
+        """
+        Diễn biến giá của một thuốc theo tháng/quý (đọc từ price_rollups).
+
+        drug: tên hoạt chất/dược liệu/vị thuốc (so khớp không dấu, bỏ khoảng trắng)
+        start/end: ngày dd/mm/yyyy hoặc kỳ 'yyyy-mm' / 'yyyy-Qn' (tính cả hai đầu)
+        Returns: list dict {'period', 'count', 'min', 'median', 'max', 'mean',
+        'volume', 'weighted_mean'} theo thứ tự thời gian.
+        """
+        if period_type not in ROLLUP_PERIODS:
+            raise ValueError(f"Kỳ không hợp lệ: {period_type}")
+        started = time.perf_counter()
+        sql = (
+            "SELECT period, count, min_price, median_price, max_price, mean_price, volume, "
+            "amount FROM price_rollups WHERE table_name = ? AND period_type = ? AND drug_key = ?"
+        )
+        params: List[object] = [table_name, period_type, fold_text(drug)]
+        for value, op in ((start, ">="), (end, "<=")):
+            if value:
+                # 'yyyy-mm' / 'yyyy-Qn' dùng nguyên; ngày thì quy về kỳ
+                period = value if len(value) == 7 else rollup_period(value, period_type)
+                if period:
+                    sql += f" AND period {op} ?"
+                    params.append(period)
+        sql += " ORDER BY period"
+
+        conn = self._get_connection()
+        try:
+            names = ("period", "count", "min", "median", "max", "mean", "volume")
+            rows = []
+            for row in conn.execute(sql, params):
+                item = dict(zip(names, row))
+                item["weighted_mean"] = _weighted_mean(row[6], row[7])
+                rows.append(item)
+            self.profiler.record(f"get_price_trend {table_name} {period_type}",
+                                 started, conn, sql, params)
+            return rows
+        finally:
+            conn.close()
+
+    def search_trend_drugs(self, table_name: str, text: str, limit: int = 50) -> List[tuple]:
+        """Các thuốc có dữ liệu xu hướng khớp `text` (không dấu).
+        Returns: [(drug_key, drug_name, tổng số giá)] nhiều giá nhất lên đầu."""
+        return [row[:3] for row in self._drug_totals(table_name, text, limit)]
+
+    def get_drug_totals(self, table_name: str, drug: str) -> dict:
+        """Tổng sản lượng, thành tiền và giá BQ gia quyền của một thuốc trên
+        toàn bộ dữ liệu (cộng từ bảng tổng hợp theo quý, không quét bảng gốc)."""
+        key = fold_text(drug)
+        for row in self._drug_totals(table_name, key, 1, exact=True):
+            return {"count": row[2], "volume": row[3], "amount": row[4],
+                    "weighted_mean": _weighted_mean(row[3], row[4])}
+        return {"count": 0, "volume": 0, "amount": 0, "weighted_mean": 0}
+
+    def _drug_totals(self, table_name: str, text: str, limit: int,
+                     exact: bool = False) -> List[tuple]:
+        """[(drug_key, drug_name, số giá, sản lượng, thành tiền)] từ các dòng theo quý."""
+        conn = self._get_connection()
+        try:
+            condition, value = ("= ?", text) if exact else ("LIKE ?", f"%{fold_text(text)}%")
+            return conn.execute(
+                "SELECT drug_key, MIN(drug_name), SUM(count) AS total, SUM(volume), "
+                "SUM(amount) FROM price_rollups "
+                f"WHERE table_name = ? AND period_type = 'quarter' AND drug_key {condition} "
+                "GROUP BY drug_key ORDER BY total DESC LIMIT ?",
+                (table_name, value, limit)
+            ).fetchall()
+        finally:
+            conn.close()
@@ -0,0 +1,36 @@
+"""
+Nạp trước các thư viện nặng (pandas, openpyxl, httpx, requests) ở luồng nền.
+Các module trong app import chúng ngay trong hàm cần dùng, nên cửa sổ đăng
+nhập / cửa sổ chính hiện ra mà không phải chờ; gọi preload_in_background()
+sau lần vẽ đầu tiên để lần Import/Sync/Export đầu không bị khựng.
+"""
+
+import importlib
+import threading
+from typing import Iterable, Optional
+
+# Chỉ dùng cho import/export/sync/cập nhật - không cần lúc khởi động
+HEAVY_MODULES = ("httpx", "pandas", "openpyxl", "requests")
+
+_preload_thread: Optional[threading.Thread] = None
+
+
+def _preload(modules: Iterable[str]):
+    for name in modules:
+        try:
+            importlib.import_module(name)
+        except Exception:
+            # Thiếu thư viện: để hàm dùng nó báo lỗi lúc cần
+            pass
+
+
+def preload_in_background(modules: Iterable[str] = HEAVY_MODULES) -> threading.Thread:
+    """Bắt đầu nạp nền (chỉ một lần). Returns: luồng nạp."""
+    global _preload_thread
+    if _preload_thread is None:
+        _preload_thread = threading.Thread(
+            target=_preload, args=(tuple(modules),),
+            name="preload-heavy-modules", daemon=True
+        )
+        _preload_thread.start()
+    return _preload_thread
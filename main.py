@@ -15,9 +15,10 @@ if script_dir not in sys.path:
 
 from PyQt6.QtWidgets import QApplication
 from PyQt6.QtGui import QFont
+from PyQt6.QtCore import QTimer
 
 from auth.login_dialog import LoginDialog
-from app import MainWindow
+from lazy_imports import preload_in_background
 
 
 def main():
@@ -37,6 +38,8 @@ def main():
 
     # Show login dialog first
     login_dialog = LoginDialog()
+    # Nạp pandas/httpx... ở luồng nền sau khi dialog đã vẽ xong
+    QTimer.singleShot(0, preload_in_background)
     if login_dialog.exec() != LoginDialog.DialogCode.Accepted:
         sys.exit(0)
 
@@ -44,6 +47,7 @@ def main():
     session = login_dialog.get_session()
 
     # Show main window with authenticated session
+    from app import MainWindow
     window = MainWindow(session)
     window.show()
 
@@ -0,0 +1,33 @@
+"""
+Chuẩn hóa văn bản tiếng Việt cho tìm kiếm.
+Bỏ dấu (NFD + loại dấu kết hợp, đ → d), chữ thường, bỏ khoảng trắng.
+"""
+
+import unicodedata
+from functools import lru_cache
+
+
+@lru_cache(maxsize=65536)
+def _fold_str(text: str) -> str:
+    if text.isascii():
+        return "".join(text.split()).lower()
+    decomposed = unicodedata.normalize("NFD", text)
+    stripped = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    stripped = stripped.replace("đ", "d").replace("Đ", "d")
+    return "".join(stripped.split()).lower()
+
+
+def fold_text(value) -> str:
+    """Bỏ dấu + chữ thường + bỏ khoảng trắng. 'Viên nén' -> 'viennen'."""
+    if value is None:
+        return ""
+    return _fold_str(str(value))
+
+
+def trigrams(value) -> set:
+    """Tập trigram của bản không dấu (đệm 1 khoảng trắng hai đầu)."""
+    folded = fold_text(value)
+    if not folded:
+        return set()
+    padded = f" {folded} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
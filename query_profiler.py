@@ -0,0 +1,139 @@
+"""
+Query Profiler - Đo thời gian truy vấn của DatabaseManager.
+Ghi log ra file xoay vòng (kèm EXPLAIN QUERY PLAN cho truy vấn chậm)
+và giữ thống kê p50/p95 theo dạng truy vấn cho bảng chẩn đoán trong app.
+"""
+
+import logging
+import math
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+from typing import Optional, Dict, List
+
+# Ngưỡng truy vấn chậm (ms), có thể chỉnh qua biến môi trường
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "200"))
+# Số mẫu thời gian giữ lại cho mỗi dạng truy vấn
+SAMPLE_SIZE = 500
+# Số truy vấn chậm gần nhất giữ lại (kèm query plan)
+SLOW_HISTORY = 50
+
+logger = logging.getLogger("tra_cuu_gia_thuoc.queries")
+logger.addHandler(logging.NullHandler())
+
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    """Percentile theo nearest-rank trên list đã sắp xếp."""
+    if not sorted_values:
+        return 0.0
+    rank = math.ceil(pct / 100 * len(sorted_values))
+    return sorted_values[max(0, min(len(sorted_values), rank) - 1)]
+
+
+class QueryProfiler:
+    """Thu thập thời gian truy vấn theo dạng (shape) và bắt query plan khi chậm."""
+
+    def __init__(self, slow_ms: float = SLOW_QUERY_MS):
+        self.slow_ms = slow_ms
+        self._samples: Dict[str, deque] = {}
+        self._counts: Dict[str, int] = {}
+        self._slow: deque = deque(maxlen=SLOW_HISTORY)
+        self._lock = threading.Lock()
+
+    def enable_file_log(self, log_path: str, max_bytes: int = 1_000_000,
+                        backup_count: int = 3):
+        """Ghi log truy vấn ra file xoay vòng (gọi một lần lúc khởi động app)."""
+        import logging.handlers
+
+        log_path = os.path.abspath(log_path)
+        for handler in logger.handlers:
+            if getattr(handler, "baseFilename", None) == log_path:
+                return
+        os.makedirs(os.path.dirname(log_path), exist_ok=True)
+        handler = logging.handlers.RotatingFileHandler(
+            log_path, maxBytes=max_bytes, backupCount=backup_count,
+            encoding="utf-8"
+        )
+        handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(message)s"))
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+
+    def record(self, shape: str, started: float,
+               conn: Optional[sqlite3.Connection] = None,
+               sql: Optional[str] = None, params: Optional[list] = None) -> float:
+        """Ghi nhận một lần gọi bắt đầu lúc `started` (time.perf_counter()).
+
+        Nếu vượt ngưỡng và có conn/sql thì chạy EXPLAIN QUERY PLAN trên cùng
+        connection. Returns: thời gian đã đo (ms).
+        """
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        with self._lock:
+            samples = self._samples.get(shape)
+            if samples is None:
+                samples = self._samples[shape] = deque(maxlen=SAMPLE_SIZE)
+            samples.append(elapsed_ms)
+            self._counts[shape] = self._counts.get(shape, 0) + 1
+
+        if elapsed_ms < self.slow_ms or conn is None or not sql:
+            logger.info("%.1fms %s", elapsed_ms, shape)
+            return elapsed_ms
+
+        plan = self._explain(conn, sql, params or [])
+        with self._lock:
+            self._slow.append({
+                "shape": shape,
+                "ms": elapsed_ms,
+                "sql": " ".join(sql.split()),
+                "plan": plan,
+                "at": time.strftime("%Y-%m-%d %H:%M:%S"),
+            })
+        logger.warning(
+            "SLOW %.1fms %s\n  SQL: %s\n  PLAN:\n%s",
+            elapsed_ms, shape, " ".join(sql.split()),
+            "\n".join(f"    {line}" for line in plan)
+        )
+        return elapsed_ms
+
+    def _explain(self, conn: sqlite3.Connection, sql: str, params: list) -> List[str]:
+        """EXPLAIN QUERY PLAN dạng cây thụt lề."""
+        try:
+            rows = conn.execute(f"EXPLAIN QUERY PLAN {sql}", params).fetchall()
+        except sqlite3.Error as e:
+            return [f"(không lấy được plan: {e})"]
+        depth = {0: 0}
+        lines = []
+        for node_id, parent_id, _, detail in rows:
+            level = depth.get(parent_id, 0) + 1
+            depth[node_id] = level
+            lines.append("  " * (level - 1) + detail)
+        return lines
+
+    def stats(self) -> List[dict]:
+        """Thống kê theo dạng truy vấn, chậm nhất (p95) lên đầu."""
+        with self._lock:
+            snapshot = {shape: sorted(samples) for shape, samples in self._samples.items()}
+            counts = dict(self._counts)
+        result = []
+        for shape, values in snapshot.items():
+            result.append({
+                "shape": shape,
+                "count": counts.get(shape, 0),
+                "p50": _percentile(values, 50),
+                "p95": _percentile(values, 95),
+                "max": values[-1] if values else 0.0,
+            })
+        result.sort(key=lambda item: item["p95"], reverse=True)
+        return result
+
+    def slow_queries(self) -> List[dict]:
+        """Các truy vấn chậm gần nhất (mới nhất lên đầu)."""
+        with self._lock:
+            return list(reversed(self._slow))
+
+    def reset(self):
+        with self._lock:
+            self._samples.clear()
+            self._counts.clear()
+            self._slow.clear()
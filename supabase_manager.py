@@ -5,7 +5,6 @@ Supabase Data Manager - Đồng bộ dữ liệu giữa Supabase và SQLite
 import os
 from typing import Optional, Callable
 from dotenv import load_dotenv
-import httpx
 
 from database import TABLE_SCHEMAS
 
@@ -68,6 +67,8 @@ class SupabaseDataManager:
         col_names = [col_name for col_name, _ in columns]
         select = ",".join(col_names)
 
+        import httpx  # nạp khi sync lần đầu (không làm chậm khởi động)
+
         all_rows = []
         offset = 0
         headers = self._get_headers()
@@ -123,6 +124,8 @@ class SupabaseDataManager:
         if not columns:
             raise ValueError(f"Bảng '{table_name}' không tồn tại")
 
+        import httpx
+
         col_names = [col_name for col_name, _ in columns]
         headers = self._get_headers(use_service_role=True)
 
@@ -162,6 +165,8 @@ class SupabaseDataManager:
 
     def get_table_count(self, table_name: str) -> int:
         """Lấy số lượng dòng trong bảng Supabase."""
+        import httpx
+
         headers = self._get_headers()
         headers["Prefer"] = "count=exact"
         headers["Range-Unit"] = "items"
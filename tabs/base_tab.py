@@ -3,7 +3,6 @@ BaseTab - Class cơ sở cho tất cả tab trong ứng dụng Tra Cứu Giá Th
 Cung cấp: search bar, bộ lọc, QTableWidget, import/export, sync Supabase.
 """
 
-import statistics
 import math
 from typing import Optional, List, Tuple
 from PyQt6.QtWidgets import (
@@ -73,6 +72,7 @@ class BaseTab(QWidget):
         # Sorting State
         self.current_sort_column = None
         self.current_sort_order = "ASC"
+        self._stats_key = None  # (tham số tìm kiếm, data version) của thống kê đang hiển thị
 
         
         self.theme_manager = ThemeManager()
@@ -148,6 +148,20 @@ class BaseTab(QWidget):
         self.search_input.returnPressed.connect(self._perform_search)
         search_inner.addWidget(self.search_input, 1)
 
+        # Search mode: khong dau (mac dinh) / co dau
+        self.search_mode_combo = QComboBox()
+        self.search_mode_combo.setObjectName("searchModeCombo")
+        self.search_mode_combo.addItem("Không dấu", "unaccent")
+        self.search_mode_combo.addItem("Có dấu", "contains")
+        self.search_mode_combo.addItem("Gần đúng", "fuzzy")
+        self.search_mode_combo.setToolTip(
+            "Không dấu: gõ 'vien nen' vẫn tìm được 'Viên nén'\n"
+            "Gần đúng: chấp nhận sai chính tả tên thuốc/hoạt chất "
+            "('Amoxicilin' -> 'Amoxicillin')"
+        )
+        self.search_mode_combo.setFixedHeight(36)
+        search_inner.addWidget(self.search_mode_combo)
+
         # Search button - main action
         self.search_btn = QPushButton("Tim kiem")
         self.search_btn.setObjectName("searchBtn")
@@ -342,6 +356,15 @@ class BaseTab(QWidget):
         self.card_max, self.lbl_val_max = create_card_widget("GIÁ CAO NHẤT", "cardMax")
         stats_layout.addWidget(self.card_max)
 
+        # 6. Giá bình quân gia quyền theo số lượng
+        self.card_weighted, self.lbl_val_weighted = create_card_widget("BQ GIA QUYỀN", "cardWeighted")
+        self.card_weighted.setToolTip("Tổng thành tiền / tổng số lượng trúng thầu")
+        stats_layout.addWidget(self.card_weighted)
+
+        # 7. Tổng số lượng
+        self.card_volume, self.lbl_val_volume = create_card_widget("TỔNG SỐ LƯỢNG", "cardVolume")
+        stats_layout.addWidget(self.card_volume)
+
 
 
         layout.addWidget(stats_container)
@@ -558,6 +581,10 @@ class BaseTab(QWidget):
         """Lay cot dang chon de tim kiem. Tra ve '' neu 'TAT CA'."""
         return self.search_column_combo.currentData() or ""
 
+    def _get_search_mode(self) -> str:
+        """Lay che do tim kiem (xem database.SEARCH_MODES)."""
+        return self.search_mode_combo.currentData() or "contains"
+
     def _toggle_date_filter(self, checked):
         self.date_edit_start.setEnabled(checked)
         self.date_edit_end.setEnabled(checked)
@@ -583,7 +610,8 @@ class BaseTab(QWidget):
             'keyword': keyword,
             'filters': filters,
             'search_column': search_col if search_col else None,
-            'date_filters': date_filters
+            'date_filters': date_filters,
+            'search_mode': self._get_search_mode()
         }
         
         self.current_page = 1
@@ -595,7 +623,8 @@ class BaseTab(QWidget):
             'keyword': "",
             'filters': [],
             'search_column': None,
-            'date_filters': None
+            'date_filters': None,
+            'search_mode': self._get_search_mode()
         }
         self.current_page = 1
         self._load_current_page()
@@ -610,7 +639,8 @@ class BaseTab(QWidget):
             keyword=params.get('keyword'),
             filters=params.get('filters'),
             search_column=params.get('search_column'),
-            date_filters=params.get('date_filters')
+            date_filters=params.get('date_filters'),
+            search_mode=params.get('search_mode', "contains")
         )
         
         # 2. Calculate offset
@@ -623,6 +653,7 @@ class BaseTab(QWidget):
             filters=params.get('filters'),
             search_column=params.get('search_column'),
             date_filters=params.get('date_filters'),
+            search_mode=params.get('search_mode', "contains"),
             limit=self.page_size,
             offset=offset,
             sort_column=self.current_sort_column,
@@ -679,46 +710,72 @@ class BaseTab(QWidget):
 
     def _calculate_stats(self, data: list):
         """Tính toán và hiển thị thống kê."""
-        total_count = len(data)
-        prices = []
-        
-        # Tim index cua cot gia
-        price_col_idx = -1
-        schema = TABLE_SCHEMAS.get(self.TABLE_NAME, [])
-        for i, (col_db, _) in enumerate(schema):
-            if col_db == self.PRICE_COLUMN:
-                price_col_idx = i
-                break
-        
-        if price_col_idx != -1:
-            for row in data:
-                if price_col_idx < len(row):
-                    val_raw = row[price_col_idx]
-                    if val_raw:
-                        # Parse price string (remove non-digits except maybe decimal separator if meaningful)
-                        # Assuming VND is integer usually or using comma/dot separators
-                        # Simple approach: keep only digits
-                        digits = "".join(filter(str.isdigit, str(val_raw)))
-                        if digits:
-                            prices.append(int(digits))
-
-        if prices:
-            p_min = min(prices)
-            p_max = max(prices)
-            p_mean = statistics.mean(prices)
-            p_median = statistics.median(prices)
-            
-            self.lbl_val_min.setText(f"{p_min:,.0f}")
-            self.lbl_val_mean.setText(f"{p_mean:,.0f}")
-            self.lbl_val_median.setText(f"{p_median:,.0f}")
-            self.lbl_val_max.setText(f"{p_max:,.0f}")
-        else:
-            self.lbl_val_min.setText("0")
-            self.lbl_val_mean.setText("0")
-            self.lbl_val_median.setText("0")
-            self.lbl_val_max.setText("0")
-            
-        self.lbl_val_total.setText(f"{total_count:,}")
+        if self._calculate_stats_columnar():
+            return
+
+        # Không có NumPy: tổng hợp bằng SQL trên cột giá/số lượng đã ép kiểu
+        params = self.current_search_params
+        stats_key = (repr(params), self.db.get_data_version(self.TABLE_NAME))
+        if stats_key == self._stats_key:
+            return
+        self._stats_key = stats_key
+
+        stats = self.db.get_price_summary(
+            self.TABLE_NAME,
+            keyword=params.get('keyword'),
+            filters=params.get('filters'),
+            search_column=params.get('search_column'),
+            date_filters=params.get('date_filters'),
+            search_mode=params.get('search_mode', "contains")
+        )
+        self._show_stats(stats)
+
+    def _show_stats(self, stats: dict):
+        """Hiển thị thống kê giá lên các thẻ."""
+        self.lbl_val_min.setText(f"{stats['min']:,.0f}")
+        self.lbl_val_mean.setText(f"{stats['mean']:,.0f}")
+        self.lbl_val_median.setText(f"{stats['median']:,.0f}")
+        self.lbl_val_max.setText(f"{stats['max']:,.0f}")
+        self.lbl_val_weighted.setText(f"{stats['weighted_mean']:,.0f}")
+        self.lbl_val_volume.setText(f"{stats['volume']:,.0f}")
+        self.lbl_val_total.setText(f"{self.total_records:,}")
+
+    def _calculate_stats_columnar(self) -> bool:
+        """Thống kê trên toàn bộ kết quả tìm kiếm bằng AnalyticsEngine (NumPy).
+        Returns: False nếu không dùng được (chưa cài NumPy) để tính theo trang.
+        """
+        engine = self.db.analytics
+        if engine is None:
+            return False
+        if not engine.is_ready(self.TABLE_NAME):
+            # Bảng lớn: nạp nền, lần tải trang sau sẽ có thống kê toàn bộ
+            engine.warm_up(self.TABLE_NAME)
+            return False
+
+        params = self.current_search_params
+        # Đổi trang không đổi kết quả tìm kiếm -> giữ nguyên thống kê
+        stats_key = (repr(params), self.db.get_data_version(self.TABLE_NAME))
+        if stats_key == self._stats_key:
+            return True
+        self._stats_key = stats_key
+
+        has_filters = bool(
+            (params.get('keyword') or "").strip()
+            or any(v and v.strip() for _, v in params.get('filters') or [])
+            or params.get('date_filters')
+        )
+        ids = None
+        if has_filters:
+            ids = self.db.search_ids(
+                self.TABLE_NAME,
+                keyword=params.get('keyword'),
+                filters=params.get('filters'),
+                search_column=params.get('search_column'),
+                date_filters=params.get('date_filters'),
+                search_mode=params.get('search_mode', "contains")
+            )
+        self._show_stats(engine.summary(self.TABLE_NAME, ids=ids))
+        return True
 
     def _populate_table(self, data: list):
         # We need data for stats, but data now includes ID at index 0
@@ -1032,6 +1089,7 @@ class BaseTab(QWidget):
                 filters=params.get('filters'),
                 search_column=params.get('search_column'),
                 date_filters=params.get('date_filters'),
+                search_mode=params.get('search_mode', "contains"),
                 limit=None,
                 offset=None
             )
@@ -1090,8 +1148,8 @@ class BaseTab(QWidget):
             }}
         """)
         
-        # Search Column Combo
-        self.search_column_combo.setStyleSheet(f"""
+        # Search Column / Mode Combo
+        combo_style = f"""
             QComboBox {{
                 background-color: {theme['widget_bg']};
                 color: {theme['text_main']};
@@ -1121,7 +1179,9 @@ class BaseTab(QWidget):
                 selection-background-color: {theme['selection_bg']};
                 padding: 4px;
             }}
-        """)
+        """
+        self.search_column_combo.setStyleSheet(combo_style)
+        self.search_mode_combo.setStyleSheet(combo_style)
 
         # Separator
         self.separator.setStyleSheet(f"background-color: {theme['border']};")
@@ -1202,6 +1262,8 @@ class BaseTab(QWidget):
         self._style_card(self.card_mean, theme['card_mean_start'], theme['card_mean_end'])
         self._style_card(self.card_median, theme['card_median_start'], theme['card_median_end'])
         self._style_card(self.card_max, theme['card_max_start'], theme['card_max_end'])
+        self._style_card(self.card_weighted, theme['card_weighted_start'], theme['card_weighted_end'])
+        self._style_card(self.card_volume, theme['card_volume_start'], theme['card_volume_end'])
 
         # Date Filter Styles
         self.chk_date_filter.setStyleSheet(f"color: {theme['text_main']};")
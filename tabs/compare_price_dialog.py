@@ -4,7 +4,6 @@ Gồm 5 tab: Generic, Biệt dược gốc, Dược liệu, Dược liệu (Raw)
 Chức năng: Tải file mẫu, Import Excel, Đối chiếu tự động/thủ công.
 """
 
-import pandas as pd
 import os
 from PyQt6.QtWidgets import (
     QDialog, QVBoxLayout, QHBoxLayout, QTabWidget, QWidget,
@@ -13,7 +12,7 @@ from PyQt6.QtWidgets import (
     QInputDialog
 )
 from PyQt6.QtCore import Qt, QThread, pyqtSignal
-from database import DatabaseManager, TABLE_SCHEMAS
+from database import DatabaseManager, TABLE_SCHEMAS, TABLE_DISPLAY_NAMES
 from tabs.search_selection_dialog import SearchSelectionDialog
 
 # Helper to normalize price
@@ -25,32 +24,42 @@ def format_currency(value):
     except:
         return "0"
 
+def parse_price(value):
+    """'1.234.567' / '1,234,567' -> 1234567; None nếu không có chữ số."""
+    digits = "".join(filter(str.isdigit, str(value or "")))
+    return int(digits) if digits else None
+
 class AutoCompareWorker(QThread):
     progress = pyqtSignal(int)
     finished = pyqtSignal()
     row_updated = pyqtSignal(int, dict) # row_index, stats dict
 
-    def __init__(self, db, table_name, rows_data, criteria_cols):
+    def __init__(self, db, table_name, rows_data, criteria_cols, ref_col=-1):
         super().__init__()
         self.db = db
         self.table_name = table_name
         self.rows_data = rows_data # List of dicts or objects
         self.criteria_cols = criteria_cols # Mapping: {db_col: index_in_row}
+        self.ref_col = ref_col # Cột "Đơn giá tham khảo" (-1 nếu không có)
 
     def run(self):
         total = len(self.rows_data)
-        for i, row in enumerate(self.rows_data):
+        criteria_list = []
+        references = []
+        for row in self.rows_data:
             criteria = {}
             for db_col, row_idx in self.criteria_cols.items():
                 val = row[row_idx]
                 if val:
                     criteria[db_col] = val
-            
-            # Additional logic for 'Nhom thuoc' matching if user requested
-            # User req: Tên hoạt chất, Nồng độ/Hàm lượng, Dạng bào chế, Nhóm thuốc (Nhóm TCKT)
-            # criteria dictionary should match what get_price_statistics expects
-            
-            stats = self.db.get_price_statistics(self.table_name, criteria)
+            criteria_list.append(criteria)
+            references.append(parse_price(row[self.ref_col]) if self.ref_col >= 0 else None)
+
+        # Một lượt cho cả kế hoạch (thay vì một truy vấn mỗi dòng)
+        distributions = self.db.get_price_distributions(
+            self.table_name, criteria_list, references
+        )
+        for i, stats in enumerate(distributions):
             self.row_updated.emit(i, stats)
             self.progress.emit(int((i + 1) / total * 100))
         
@@ -62,6 +71,9 @@ class CompareTab(QWidget):
         super().__init__(parent)
         self.db = db
         self.table_name = table_name
+        # Kết quả phân bố giá của lần đối chiếu tự động gần nhất (theo dòng)
+        self.distributions = []
+        self.distribution_table = table_name
         
         # Define Columns based on User Request
         # Tab 1-4 share similar structure, Tab 5 (Vi thuoc) differs slightly
@@ -70,7 +82,8 @@ class CompareTab(QWidget):
             "STT", "STT Thông tư", "Mã thuốc", "Tên hoạt chất",
             "Nồng độ/Hàm lượng", "Dạng bào chế", "Dạng trình bày",
             "Đường dùng", "Đơn vị tính", "Nhóm TCKT",
-            "Đơn giá tham khảo", "Giá Min", "Giá Max", "Số kết quả tìm thấy"
+            "Đơn giá tham khảo", "Giá Min", "Giá Max",
+            "Giá BQ gia quyền", "Tổng SL trúng thầu", "Số kết quả tìm thấy"
         ]
         
         # Adjust for Tab 2 (Biệt dược gốc) - "Tên thuốc" added
@@ -83,7 +96,8 @@ class CompareTab(QWidget):
                 "STT", "STT Thông tư", "Mã thuốc", "Tên vị thuốc",
                 "Tên khoa học", "Bộ phận dùng", "Phương pháp chế biến",
                 "Tiêu chuẩn chất lượng", "Đơn vị tính", "Nhóm TCKT",
-                "Đơn giá tham khảo", "Giá Min", "Giá Max", "Số kết quả tìm thấy"
+                "Đơn giá tham khảo", "Giá Min", "Giá Max",
+                "Giá BQ gia quyền", "Tổng SL trúng thầu", "Số kết quả tìm thấy"
             ]
         
         self.columns = base_cols
@@ -156,6 +170,12 @@ class CompareTab(QWidget):
         self.btn_compare = QPushButton("⚡ Đối chiếu Tự động")
         self.btn_compare.clicked.connect(self._auto_compare)
         btn_layout.addWidget(self.btn_compare)
+
+        self.btn_distribution = QPushButton("📊 Phân bố giá")
+        self.btn_distribution.setToolTip("Percentile, ngưỡng ngoại lai và histogram giá của từng dòng")
+        self.btn_distribution.setEnabled(False)
+        self.btn_distribution.clicked.connect(self._show_distribution)
+        btn_layout.addWidget(self.btn_distribution)
         
         
         self.btn_export = QPushButton("📤 Xuất Excel")
@@ -194,6 +214,8 @@ class CompareTab(QWidget):
         layout.addWidget(self.lbl_status)
 
     def _download_template(self):
+        import pandas as pd
+
         path, _ = QFileDialog.getSaveFileName(self, "Lưu file mẫu", f"Mau_{self.table_name}.xlsx", "Excel Files (*.xlsx)")
         if path:
             df = pd.DataFrame(columns=self.columns)
@@ -201,6 +223,8 @@ class CompareTab(QWidget):
             QMessageBox.information(self, "Thành công", "Đã tạo file mẫu thành công.")
 
     def _import_excel(self):
+        import pandas as pd
+
         path, _ = QFileDialog.getOpenFileName(self, "Chọn file Excel", "", "Excel Files (*.xlsx *.xls);;CSV Files (*.csv)")
         if path:
             try:
@@ -292,7 +316,10 @@ class CompareTab(QWidget):
                 row_items.append(item.text() if item else "")
             rows_data.append(row_items)
             
-        self.worker = AutoCompareWorker(self.db, target_table, rows_data, criteria_mapping)
+        self.distributions = [None] * len(rows_data)
+        self.distribution_table = target_table
+        ref_col = self.columns.index("Đơn giá tham khảo") if "Đơn giá tham khảo" in self.columns else -1
+        self.worker = AutoCompareWorker(self.db, target_table, rows_data, criteria_mapping, ref_col)
         self.worker.row_updated.connect(self._update_row_stats)
         self.worker.progress.connect(self.progress.setValue)
         self.worker.finished.connect(self._on_compare_finished)
@@ -386,6 +413,8 @@ class CompareTab(QWidget):
         return mapping
 
     def _update_row_stats(self, row_idx, stats):
+        if row_idx < len(self.distributions):
+            self.distributions[row_idx] = stats
         # Update Min, Max, Count, Ref Price (if needed)
         # Stats: min, max, count
         # Columns: "Đơn giá tham khảo", "Giá Min", "Giá Max", "Số kết quả tìm thấy"
@@ -399,6 +428,13 @@ class CompareTab(QWidget):
              self.table.setItem(row_idx, idx_min, QTableWidgetItem(format_currency(stats['min'])))
              self.table.setItem(row_idx, idx_max, QTableWidgetItem(format_currency(stats['max'])))
              self.table.setItem(row_idx, idx_count, QTableWidgetItem(str(stats['count'])))
+
+             idx_weighted = self.columns.index("Giá BQ gia quyền")
+             idx_volume = self.columns.index("Tổng SL trúng thầu")
+             self.table.setItem(row_idx, idx_weighted,
+                                QTableWidgetItem(format_currency(stats.get('weighted_mean', 0))))
+             self.table.setItem(row_idx, idx_volume,
+                                QTableWidgetItem(format_currency(stats.get('volume', 0))))
              
         except ValueError:
             pass
@@ -406,8 +442,31 @@ class CompareTab(QWidget):
     def _on_compare_finished(self):
         self.progress.setVisible(False)
         self.btn_compare.setEnabled(True)
+        self.btn_distribution.setEnabled(any(self.distributions))
         QMessageBox.information(self, "Hoàn tất", "Đã hoàn thành đối chiếu tự động.")
 
+    def _show_distribution(self):
+        from tabs.price_distribution_dialog import PriceDistributionDialog
+
+        # Nhãn dòng: tên + hàm lượng (nếu bảng kế hoạch có các cột này)
+        label_cols = [
+            self.columns.index(name)
+            for name in ("Tên hoạt chất", "Tên vị thuốc", "Nồng độ/Hàm lượng")
+            if name in self.columns
+        ]
+        labels = []
+        for r in range(len(self.distributions)):
+            parts = []
+            for c in label_cols:
+                item = self.table.item(r, c)
+                if item and item.text().strip():
+                    parts.append(item.text().strip())
+            labels.append(" - ".join(parts) or f"Dòng {r + 1}")
+
+        dialog = PriceDistributionDialog(labels, self.distributions,
+                                         TABLE_DISPLAY_NAMES.get(self.distribution_table, ""), self)
+        dialog.exec()
+
     def _manual_compare(self, index):
         row = index.row()
         
@@ -504,6 +563,8 @@ class CompareTab(QWidget):
 
 
     def _export_excel(self):
+        import pandas as pd
+
         path, _ = QFileDialog.getSaveFileName(self, "Xuất Excel", f"KetQua_{self.table_name}.xlsx", "Excel Files (*.xlsx)")
         if path:
             # Gather data
@@ -529,6 +590,8 @@ class CompareTab(QWidget):
         return os.path.join(drafts_dir, f"draft_{self.table_name}.json")
 
     def _save_draft(self):
+        import pandas as pd
+
         try:
             # Collect data
             data = []
@@ -552,6 +615,8 @@ class CompareTab(QWidget):
             QMessageBox.critical(self, "Lỗi", f"Không thể lưu bản nháp: {str(e)}")
 
     def _load_draft(self):
+        import pandas as pd
+
         path = self._get_draft_path()
         if not os.path.exists(path):
             QMessageBox.warning(self, "Thông báo", "Chưa có bản nháp nào được lưu cho bảng này.")
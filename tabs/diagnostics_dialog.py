@@ -0,0 +1,103 @@
+"""
+Dialog: Chẩn đoán truy vấn.
+Hiển thị thời gian p50/p95 theo dạng truy vấn và các truy vấn chậm
+gần nhất kèm EXPLAIN QUERY PLAN (dữ liệu từ DatabaseManager.profiler).
+"""
+
+from PyQt6.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QPushButton, QTableWidget,
+    QTableWidgetItem, QHeaderView, QLabel, QPlainTextEdit, QSplitter
+)
+from PyQt6.QtCore import Qt, QTimer
+from database import DatabaseManager
+
+
+class QueryDiagnosticsDialog(QDialog):
+    """Bảng thống kê thời gian truy vấn (tự làm mới mỗi 2 giây)."""
+
+    COLUMNS = ["Dạng truy vấn", "Số lần", "p50 (ms)", "p95 (ms)", "Max (ms)"]
+
+    def __init__(self, db: DatabaseManager, parent=None):
+        super().__init__(parent)
+        self.db = db
+        self.setWindowTitle("🩺 Chẩn đoán truy vấn")
+        self.resize(1000, 650)
+        self._setup_ui()
+        self._refresh()
+
+        self._timer = QTimer(self)
+        self._timer.timeout.connect(self._refresh)
+        self._timer.start(2000)
+
+    def _setup_ui(self):
+        layout = QVBoxLayout(self)
+
+        self.lbl_info = QLabel()
+        self.lbl_info.setStyleSheet("color: gray; font-style: italic;")
+        layout.addWidget(self.lbl_info)
+
+        splitter = QSplitter(Qt.Orientation.Vertical)
+
+        self.table = QTableWidget()
+        self.table.setColumnCount(len(self.COLUMNS))
+        self.table.setHorizontalHeaderLabels(self.COLUMNS)
+        self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.table.verticalHeader().setVisible(False)
+        header = self.table.horizontalHeader()
+        header.setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        splitter.addWidget(self.table)
+
+        self.slow_text = QPlainTextEdit()
+        self.slow_text.setReadOnly(True)
+        self.slow_text.setStyleSheet("font-family: Consolas, monospace; font-size: 11px;")
+        splitter.addWidget(self.slow_text)
+        splitter.setSizes([350, 250])
+        layout.addWidget(splitter, 1)
+
+        btn_layout = QHBoxLayout()
+        btn_refresh = QPushButton("🔄 Làm mới")
+        btn_refresh.clicked.connect(self._refresh)
+        btn_layout.addWidget(btn_refresh)
+
+        btn_reset = QPushButton("🗑 Xóa thống kê")
+        btn_reset.clicked.connect(self._reset)
+        btn_layout.addWidget(btn_reset)
+
+        btn_layout.addStretch()
+        btn_close = QPushButton("Đóng")
+        btn_close.clicked.connect(self.accept)
+        btn_layout.addWidget(btn_close)
+        layout.addLayout(btn_layout)
+
+    def _refresh(self):
+        profiler = self.db.profiler
+        self.lbl_info.setText(
+            f"Truy vấn chậm hơn {profiler.slow_ms:.0f} ms được ghi kèm query plan."
+        )
+
+        stats = profiler.stats()
+        self.table.setRowCount(len(stats))
+        for r, item in enumerate(stats):
+            values = [
+                item["shape"], f"{item['count']:,}",
+                f"{item['p50']:.1f}", f"{item['p95']:.1f}", f"{item['max']:.1f}",
+            ]
+            for c, value in enumerate(values):
+                cell = QTableWidgetItem(value)
+                if c > 0:
+                    cell.setTextAlignment(
+                        Qt.AlignmentFlag.AlignVCenter | Qt.AlignmentFlag.AlignRight
+                    )
+                self.table.setItem(r, c, cell)
+
+        lines = []
+        for slow in profiler.slow_queries():
+            lines.append(f"[{slow['at']}] {slow['ms']:.1f} ms  {slow['shape']}")
+            lines.append(f"  SQL: {slow['sql']}")
+            lines.extend(f"    {plan_line}" for plan_line in slow["plan"])
+            lines.append("")
+        self.slow_text.setPlainText("\n".join(lines) or "Chưa có truy vấn chậm.")
+
+    def _reset(self):
+        self.db.profiler.reset()
+        self._refresh()
@@ -0,0 +1,206 @@
+"""
+Dialog: Phân bố giá trúng thầu theo từng dòng kế hoạch.
+Bảng percentile / ngưỡng ngoại lai (IQR) / vị trí của đơn giá tham khảo,
+kèm histogram giá của dòng đang chọn (vẽ bằng QPainter, không cần QtCharts).
+Dữ liệu lấy từ DatabaseManager.get_price_distributions().
+"""
+
+from PyQt6.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QPushButton, QTableWidget,
+    QTableWidgetItem, QHeaderView, QLabel, QSplitter, QWidget
+)
+from PyQt6.QtCore import Qt, QRectF
+from PyQt6.QtGui import QColor, QPainter, QPen
+
+# Màu theo đánh giá đơn giá tham khảo so với ngưỡng IQR
+FLAG_LABELS = {"low": "Thấp bất thường", "normal": "Trong khoảng", "high": "Cao bất thường"}
+FLAG_COLORS = {"low": "#1565c0", "normal": "#2e7d32", "high": "#c62828"}
+
+
+def _money(value) -> str:
+    return f"{value:,.0f}" if value else "0"
+
+
+class HistogramWidget(QWidget):
+    """Histogram giá: cột theo histogram['counts'], vạch ngưỡng IQR và giá tham khảo."""
+
+    MARGIN = 36
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.stats = None
+        self.setMinimumHeight(180)
+
+    def set_stats(self, stats):
+        self.stats = stats
+        self.update()
+
+    def _x(self, value, left, width):
+        edges = self.stats["histogram"]["edges"]
+        low, high = edges[0], edges[-1]
+        if high <= low:
+            return left + width / 2
+        ratio = min(max((value - low) / (high - low), 0.0), 1.0)
+        return left + ratio * width
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        painter.fillRect(self.rect(), QColor("white"))
+
+        histogram = (self.stats or {}).get("histogram") or {}
+        counts = histogram.get("counts") or []
+        if not counts:
+            painter.setPen(QColor("gray"))
+            painter.drawText(self.rect(), Qt.AlignmentFlag.AlignCenter, "Không có dữ liệu giá")
+            return
+
+        left = self.MARGIN
+        top = 12
+        width = self.width() - 2 * self.MARGIN
+        height = self.height() - top - self.MARGIN
+        peak = max(counts) or 1
+        bar_width = width / len(counts)
+
+        painter.setPen(Qt.PenStyle.NoPen)
+        painter.setBrush(QColor("#90caf9"))
+        for i, count in enumerate(counts):
+            bar_height = height * count / peak
+            painter.drawRect(QRectF(left + i * bar_width + 1, top + height - bar_height,
+                                    bar_width - 2, bar_height))
+
+        # Trục + nhãn min/max
+        painter.setPen(QColor("#424242"))
+        painter.drawLine(left, top + height, left + width, top + height)
+        edges = histogram["edges"]
+        painter.drawText(QRectF(left - 30, top + height + 4, 120, 20),
+                         Qt.AlignmentFlag.AlignLeft, _money(edges[0]))
+        painter.drawText(QRectF(left + width - 90, top + height + 4, 120, 20),
+                         Qt.AlignmentFlag.AlignRight, _money(edges[-1]))
+        painter.drawText(QRectF(left - 30, top - 2, 60, 16),
+                         Qt.AlignmentFlag.AlignLeft, str(peak))
+
+        # Ngưỡng ngoại lai (nét đứt) và giá tham khảo (nét liền)
+        dashed = QPen(QColor("#757575"))
+        dashed.setStyle(Qt.PenStyle.DashLine)
+        painter.setPen(dashed)
+        for key in ("lower_fence", "upper_fence"):
+            x = self._x(self.stats[key], left, width)
+            painter.drawLine(int(x), top, int(x), top + height)
+
+        reference = self.stats.get("reference")
+        if reference:
+            color = QColor(FLAG_COLORS.get(self.stats.get("reference_flag"), "#000000"))
+            painter.setPen(QPen(color, 2))
+            x = self._x(reference, left, width)
+            painter.drawLine(int(x), top, int(x), top + height)
+        painter.end()
+
+
+class PriceDistributionDialog(QDialog):
+    """Bảng phân bố giá của các dòng kế hoạch + histogram dòng đang chọn."""
+
+    COLUMNS = [
+        "STT", "Mặt hàng", "Số giá", "P25", "Trung vị", "P75",
+        "Ngưỡng dưới", "Ngưỡng trên", "Ngoại lai", "BQ gia quyền",
+        "Đơn giá tham khảo", "Vị trí (%)", "Đánh giá"
+    ]
+    FLAG_COLUMN = 12
+
+    def __init__(self, labels, distributions, table_label: str = "", parent=None):
+        super().__init__(parent)
+        self.labels = labels
+        self.distributions = distributions
+        title = "📊 Phân bố giá trúng thầu"
+        self.setWindowTitle(f"{title} - {table_label}" if table_label else title)
+        self.resize(1150, 700)
+        self._setup_ui()
+        self._fill()
+
+    def _setup_ui(self):
+        layout = QVBoxLayout(self)
+
+        self.lbl_summary = QLabel()
+        self.lbl_summary.setStyleSheet("color: gray; font-style: italic;")
+        layout.addWidget(self.lbl_summary)
+
+        splitter = QSplitter(Qt.Orientation.Vertical)
+
+        self.table = QTableWidget()
+        self.table.setColumnCount(len(self.COLUMNS))
+        self.table.setHorizontalHeaderLabels(self.COLUMNS)
+        self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
+        self.table.verticalHeader().setVisible(False)
+        self.table.horizontalHeader().setSectionResizeMode(1, QHeaderView.ResizeMode.Stretch)
+        self.table.currentCellChanged.connect(self._on_row_changed)
+        splitter.addWidget(self.table)
+
+        chart_box = QWidget()
+        chart_layout = QVBoxLayout(chart_box)
+        chart_layout.setContentsMargins(0, 0, 0, 0)
+        self.lbl_chart = QLabel()
+        chart_layout.addWidget(self.lbl_chart)
+        self.histogram = HistogramWidget()
+        chart_layout.addWidget(self.histogram, 1)
+        splitter.addWidget(chart_box)
+        splitter.setSizes([420, 240])
+        layout.addWidget(splitter, 1)
+
+        btn_layout = QHBoxLayout()
+        btn_layout.addStretch()
+        btn_close = QPushButton("Đóng")
+        btn_close.clicked.connect(self.accept)
+        btn_layout.addWidget(btn_close)
+        layout.addLayout(btn_layout)
+
+    def _fill(self):
+        self.table.setRowCount(len(self.distributions))
+        flagged = 0
+        for r, stats in enumerate(self.distributions):
+            stats = stats or {}
+            flag = stats.get("reference_flag")
+            if flag in ("low", "high"):
+                flagged += 1
+            position = stats.get("reference_percentile")
+            values = [
+                str(r + 1), self.labels[r] if r < len(self.labels) else "",
+                str(stats.get("count", 0)),
+                _money(stats.get("p25")), _money(stats.get("median")), _money(stats.get("p75")),
+                _money(stats.get("lower_fence")), _money(stats.get("upper_fence")),
+                str(stats.get("outliers_low", 0) + stats.get("outliers_high", 0)),
+                _money(stats.get("weighted_mean")),
+                _money(stats.get("reference")),
+                f"{position:.0f}" if position is not None else "",
+                FLAG_LABELS.get(flag, ""),
+            ]
+            for c, value in enumerate(values):
+                item = QTableWidgetItem(value)
+                if c >= 2 and c != self.FLAG_COLUMN:
+                    item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+                if c == self.FLAG_COLUMN and flag:
+                    item.setForeground(QColor(FLAG_COLORS[flag]))
+                self.table.setItem(r, c, item)
+        self.lbl_summary.setText(
+            f"{len(self.distributions)} dòng - {flagged} dòng có đơn giá tham khảo nằm ngoài "
+            f"ngưỡng [Q1 - 1.5×IQR, Q3 + 1.5×IQR]."
+        )
+        if self.distributions:
+            self.table.selectRow(0)
+            self._on_row_changed(0, 0, -1, -1)
+
+    def _on_row_changed(self, row, _column, _prev_row, _prev_column):
+        if row < 0 or row >= len(self.distributions):
+            return
+        stats = self.distributions[row] or {}
+        self.histogram.set_stats(stats)
+        if stats.get("count"):
+            self.lbl_chart.setText(
+                f"{self.labels[row]}: {stats['count']} giá, "
+                f"min {_money(stats['min'])} - max {_money(stats['max'])}, "
+                f"trung bình {_money(stats['mean'])}, "
+                f"BQ gia quyền {_money(stats.get('weighted_mean'))} "
+                f"(tổng SL {_money(stats.get('volume'))})"
+            )
+        else:
+            self.lbl_chart.setText(f"{self.labels[row]}: không tìm thấy giá")
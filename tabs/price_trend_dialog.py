@@ -0,0 +1,237 @@
+"""
+Dialog: Xu hướng giá trúng thầu theo tháng/quý.
+Chọn bảng + hoạt chất, xem min/trung vị/max và sản lượng từng kỳ.
+Dữ liệu đọc từ bảng tổng hợp price_rollups (DatabaseManager.get_price_trend),
+biểu đồ vẽ bằng QPainter (không cần QtCharts).
+"""
+
+from datetime import date
+
+from PyQt6.QtWidgets import (
+    QDialog, QVBoxLayout, QHBoxLayout, QPushButton, QTableWidget,
+    QTableWidgetItem, QHeaderView, QLabel, QSplitter, QWidget, QLineEdit,
+    QComboBox, QListWidget, QListWidgetItem
+)
+from PyQt6.QtCore import Qt, QPointF, QRectF, QTimer
+from PyQt6.QtGui import QColor, QPainter, QPen, QPolygonF
+
+from database import DatabaseManager, TABLE_DISPLAY_NAMES
+
+
+def _money(value) -> str:
+    return f"{value:,.0f}" if value else "0"
+
+
+class TrendChartWidget(QWidget):
+    """Dải min-max, đường trung vị và cột sản lượng theo kỳ."""
+
+    MARGIN_LEFT = 70
+    MARGIN = 16
+    VOLUME_RATIO = 0.22  # phần chiều cao dành cho cột sản lượng
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.points = []
+        self.setMinimumHeight(260)
+
+    def set_points(self, points):
+        self.points = points
+        self.update()
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        painter.fillRect(self.rect(), QColor("white"))
+        if not self.points:
+            painter.setPen(QColor("gray"))
+            painter.drawText(self.rect(), Qt.AlignmentFlag.AlignCenter, "Chọn một hoạt chất để xem xu hướng")
+            return
+
+        left = self.MARGIN_LEFT
+        top = self.MARGIN
+        width = self.width() - left - self.MARGIN
+        height = self.height() - top - 40
+        price_height = height * (1 - self.VOLUME_RATIO)
+        volume_top = top + price_height + 8
+        volume_height = height - price_height - 8
+
+        low = min(p["min"] for p in self.points)
+        high = max(p["max"] for p in self.points)
+        span = (high - low) or 1
+        peak_volume = max(p["volume"] or 0 for p in self.points) or 1
+        step = width / max(len(self.points) - 1, 1)
+
+        def x(i):
+            return left + (i * step if len(self.points) > 1 else width / 2)
+
+        def y(value):
+            return top + price_height - (value - low) / span * price_height
+
+        # Dải min-max
+        band = QPolygonF(
+            [QPointF(x(i), y(p["max"])) for i, p in enumerate(self.points)]
+            + [QPointF(x(i), y(p["min"])) for i, p in reversed(list(enumerate(self.points)))]
+        )
+        painter.setPen(Qt.PenStyle.NoPen)
+        painter.setBrush(QColor(144, 202, 249, 110))
+        painter.drawPolygon(band)
+
+        # Cột sản lượng
+        painter.setBrush(QColor("#cfd8dc"))
+        bar_width = max(min(step * 0.6, 24), 2)
+        for i, p in enumerate(self.points):
+            bar_height = volume_height * (p["volume"] or 0) / peak_volume
+            painter.drawRect(QRectF(x(i) - bar_width / 2, volume_top + volume_height - bar_height,
+                                    bar_width, bar_height))
+
+        # Đường trung vị
+        painter.setPen(QPen(QColor("#1565c0"), 2))
+        painter.setBrush(QColor("#1565c0"))
+        median_points = [QPointF(x(i), y(p["median"])) for i, p in enumerate(self.points)]
+        for a, b in zip(median_points, median_points[1:]):
+            painter.drawLine(a, b)
+        for point in median_points:
+            painter.drawEllipse(point, 3, 3)
+
+        # Trục + nhãn
+        painter.setPen(QColor("#424242"))
+        painter.drawLine(QPointF(left, top), QPointF(left, top + price_height))
+        painter.drawLine(QPointF(left, top + height), QPointF(left + width, top + height))
+        painter.drawText(QRectF(0, top - 8, left - 6, 16),
+                         Qt.AlignmentFlag.AlignRight, _money(high))
+        painter.drawText(QRectF(0, top + price_height - 8, left - 6, 16),
+                         Qt.AlignmentFlag.AlignRight, _money(low))
+        painter.drawText(QRectF(0, volume_top, left - 6, 16),
+                         Qt.AlignmentFlag.AlignRight, "SL")
+        label_every = max(1, int(70 / max(step, 1)))
+        for i, p in enumerate(self.points):
+            if i % label_every == 0 or i == len(self.points) - 1:
+                painter.drawText(QRectF(x(i) - 35, top + height + 4, 70, 16),
+                                 Qt.AlignmentFlag.AlignHCenter, p["period"])
+        painter.end()
+
+
+class PriceTrendDialog(QDialog):
+    """Tra cứu xu hướng giá theo kỳ cho một hoạt chất."""
+
+    COLUMNS = ["Kỳ", "Số giá", "Giá Min", "Trung vị", "Giá Max", "Trung bình",
+               "BQ gia quyền", "Sản lượng"]
+    RANGES = [("Tất cả", None), ("2 năm gần nhất", 2), ("1 năm gần nhất", 1)]
+
+    def __init__(self, db: DatabaseManager, table_name: str = "thuoc_generic", parent=None):
+        super().__init__(parent)
+        self.db = db
+        self.setWindowTitle("📈 Xu hướng giá trúng thầu")
+        self.resize(1150, 720)
+        self._setup_ui()
+
+        index = self.cmb_table.findData(table_name)
+        self.cmb_table.setCurrentIndex(max(index, 0))
+
+        # Gõ tới đâu lọc tới đó (chờ ngừng gõ 250 ms)
+        self._search_timer = QTimer(self)
+        self._search_timer.setSingleShot(True)
+        self._search_timer.timeout.connect(self._search_drugs)
+        self.txt_search.textChanged.connect(lambda: self._search_timer.start(250))
+        self._search_drugs()
+
+    def _setup_ui(self):
+        layout = QVBoxLayout(self)
+
+        controls = QHBoxLayout()
+        self.cmb_table = QComboBox()
+        for table_name, label in TABLE_DISPLAY_NAMES.items():
+            self.cmb_table.addItem(label, table_name)
+        self.cmb_table.currentIndexChanged.connect(self._search_drugs)
+        controls.addWidget(QLabel("Bảng:"))
+        controls.addWidget(self.cmb_table)
+
+        self.txt_search = QLineEdit()
+        self.txt_search.setPlaceholderText("Tên hoạt chất (không cần dấu)...")
+        controls.addWidget(self.txt_search, 1)
+
+        self.cmb_period = QComboBox()
+        self.cmb_period.addItem("Theo tháng", "month")
+        self.cmb_period.addItem("Theo quý", "quarter")
+        self.cmb_period.currentIndexChanged.connect(self._load_trend)
+        controls.addWidget(self.cmb_period)
+
+        self.cmb_range = QComboBox()
+        for label, years in self.RANGES:
+            self.cmb_range.addItem(label, years)
+        self.cmb_range.currentIndexChanged.connect(self._load_trend)
+        controls.addWidget(self.cmb_range)
+        layout.addLayout(controls)
+
+        splitter = QSplitter(Qt.Orientation.Horizontal)
+        self.list_drugs = QListWidget()
+        self.list_drugs.currentItemChanged.connect(self._load_trend)
+        splitter.addWidget(self.list_drugs)
+
+        right = QSplitter(Qt.Orientation.Vertical)
+        self.chart = TrendChartWidget()
+        right.addWidget(self.chart)
+
+        self.table = QTableWidget()
+        self.table.setColumnCount(len(self.COLUMNS))
+        self.table.setHorizontalHeaderLabels(self.COLUMNS)
+        self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.table.verticalHeader().setVisible(False)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        right.addWidget(self.table)
+        right.setSizes([400, 220])
+        splitter.addWidget(right)
+        splitter.setSizes([260, 890])
+        layout.addWidget(splitter, 1)
+
+        btn_layout = QHBoxLayout()
+        self.lbl_status = QLabel()
+        self.lbl_status.setStyleSheet("color: gray; font-style: italic;")
+        btn_layout.addWidget(self.lbl_status, 1)
+        btn_close = QPushButton("Đóng")
+        btn_close.clicked.connect(self.accept)
+        btn_layout.addWidget(btn_close)
+        layout.addLayout(btn_layout)
+
+    def _search_drugs(self):
+        table_name = self.cmb_table.currentData()
+        self.list_drugs.clear()
+        for drug_key, drug_name, total in self.db.search_trend_drugs(
+                table_name, self.txt_search.text()):
+            item = QListWidgetItem(f"{drug_name} ({total:,})")
+            item.setData(Qt.ItemDataRole.UserRole, drug_key)
+            self.list_drugs.addItem(item)
+        if self.list_drugs.count():
+            self.list_drugs.setCurrentRow(0)
+        else:
+            self._show([])
+
+    def _load_trend(self, *_args):
+        item = self.list_drugs.currentItem()
+        if item is None:
+            self._show([])
+            return
+        start = None
+        years = self.cmb_range.currentData()
+        if years:
+            today = date.today()
+            start = f"{today.day:02d}/{today.month:02d}/{today.year - years}"
+        points = self.db.get_price_trend(
+            self.cmb_table.currentData(), item.data(Qt.ItemDataRole.UserRole),
+            self.cmb_period.currentData(), start=start
+        )
+        self._show(points)
+
+    def _show(self, points):
+        self.chart.set_points(points)
+        self.table.setRowCount(len(points))
+        for r, p in enumerate(points):
+            values = [p["period"], str(p["count"]), _money(p["min"]), _money(p["median"]),
+                      _money(p["max"]), _money(p["mean"]), _money(p["weighted_mean"]),
+                      f"{p['volume'] or 0:,}"]
+            for c, value in enumerate(values):
+                item = QTableWidgetItem(value)
+                if c:
+                    item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+                self.table.setItem(r, c, item)
+        self.lbl_status.setText(f"{len(points)} kỳ" if points else "Không có dữ liệu")
@@ -103,7 +103,8 @@ class SearchSelectionDialog(QDialog):
         # Count
         self.total_records = self.db.count_search_data(
             self.table_name,
-            keyword=self.current_keyword
+            keyword=self.current_keyword,
+            search_mode="unaccent"
         )
         
         # Data
@@ -111,6 +112,7 @@ class SearchSelectionDialog(QDialog):
         data = self.db.search_data(
             self.table_name,
             keyword=self.current_keyword,
+            search_mode="unaccent",
             limit=self.page_size,
             offset=offset
         )
@@ -0,0 +1,89 @@
+import unittest
+import os
+import statistics
+import sys
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import DatabaseManager
+from analytics import AnalyticsEngine
+
+
+def _row(stt, name, strength, price, date, qty="10"):
+    row = [""] * 23
+    row[0], row[2], row[3], row[12], row[13], row[20] = stt, name, strength, qty, price, date
+    return tuple(row)
+
+
+@unittest.skipUnless(AnalyticsEngine.available(), "NumPy chưa được cài")
+class TestAnalytics(unittest.TestCase):
+    def setUp(self):
+        self.test_db_path = "test_analytics.db"
+        if os.path.exists(self.test_db_path):
+            os.remove(self.test_db_path)
+
+        self.db = DatabaseManager(self.test_db_path)
+        self.db.replace_all_data("thuoc_generic", [
+            _row("1", "Paracetamol", "500mg", "1.000", "15/03/2024"),
+            _row("2", "paracetamol ", "500mg", "1.200", "01/06/2023"),
+            _row("3", "Paracetamol", "500mg", "2.000", "20/12/2024"),
+            _row("4", "Paracetamol", "500mg", "9.000", "05/01/2025"),
+            _row("5", "Amoxicillin", "250mg", "3.500", "10/10/2024"),
+            _row("6", "Amoxicillin", "250mg", "", "10/10/2024"),
+        ])
+
+    def tearDown(self):
+        if hasattr(self, 'db'):
+            del self.db
+        if os.path.exists(self.test_db_path):
+            try:
+                os.remove(self.test_db_path)
+            except:
+                pass
+
+    def test_summary_matches_statistics(self):
+        stats = self.db.analytics.summary("thuoc_generic", {"ten_hoat_chat": "PARACETAMOL"})
+        prices = [1000, 1200, 2000, 9000]
+        self.assertEqual(stats["count"], 4)
+        self.assertEqual(stats["min"], 1000)
+        self.assertEqual(stats["max"], 9000)
+        self.assertAlmostEqual(stats["mean"], statistics.mean(prices))
+        self.assertAlmostEqual(stats["median"], statistics.median(prices))
+
+        # Same numbers as the SQL path used by the compare dialog
+        sql_stats = self.db.get_price_statistics("thuoc_generic", {"ten_hoat_chat": "Paracetamol"})
+        self.assertEqual(sql_stats["min"], stats["min"])
+        self.assertEqual(sql_stats["max"], stats["max"])
+
+    def test_group_stats_and_filters(self):
+        groups = self.db.analytics.group_stats("thuoc_generic", ["ten_hoat_chat", "nong_do_ham_luong"])
+        self.assertEqual([(g["ten_hoat_chat"], g["count"]) for g in groups],
+                         [("paracetamol", 4), ("amoxicillin", 1)])
+
+        stats = self.db.analytics.summary("thuoc_generic", date_range=("01/01/2024", "31/12/2024"))
+        self.assertEqual(stats["count"], 3)
+
+        ids = self.db.search_ids("thuoc_generic", "amoxi", search_mode="unaccent")
+        self.assertEqual(len(ids), 2)
+        self.assertEqual(self.db.analytics.summary("thuoc_generic", ids=ids)["count"], 1)
+
+        self.assertEqual(self.db.analytics.summary("thuoc_generic", {"ten_hoat_chat": "Không có"})["count"], 0)
+
+    def test_refresh_on_data_version(self):
+        engine = self.db.analytics
+        self.assertFalse(engine.is_ready("thuoc_generic"))
+        engine.warm_up("thuoc_generic").join(timeout=30)
+        self.assertTrue(engine.is_ready("thuoc_generic"))
+        before = engine.table("thuoc_generic")
+        self.assertIs(engine.table("thuoc_generic"), before)
+
+        self.db.replace_all_data("thuoc_generic", [_row("1", "Cefixim", "100mg", "5.000", "01/01/2024")])
+        self.assertFalse(engine.is_ready("thuoc_generic"))
+        after = engine.table("thuoc_generic")
+        self.assertIsNot(after, before)
+        self.assertEqual(engine.summary("thuoc_generic")["max"], 5000)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+import unittest
+import os
+import sys
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import DatabaseManager
+from analytics import AnalyticsEngine, price_distribution
+
+
+def _row(stt, name, strength, price):
+    row = [""] * 23
+    row[0], row[2], row[3], row[13] = stt, name, strength, price
+    return tuple(row)
+
+
+class TestPriceDistribution(unittest.TestCase):
+    def setUp(self):
+        self.test_db_path = "test_price_distribution.db"
+        if os.path.exists(self.test_db_path):
+            os.remove(self.test_db_path)
+
+        self.db = DatabaseManager(self.test_db_path)
+        prices = ["1.000", "1.100", "1.200", "1.300", "1.400", "9.000"]
+        rows = [_row(str(i), "Paracetamol", "500mg", p) for i, p in enumerate(prices)]
+        rows.append(_row("7", "paracetamol ", "500MG", "1.250"))
+        rows.append(_row("8", "Amoxicillin", "250mg", "3.500"))
+        rows.append(_row("9", "Amoxicillin", "250mg", ""))
+        self.db.replace_all_data("thuoc_generic", rows)
+
+        self.plan = [
+            {"ten_hoat_chat": "PARACETAMOL", "nong_do_ham_luong": "500mg"},
+            {"ten_hoat_chat": "Amoxicillin"},
+            {"ten_hoat_chat": "Không có"},
+            {},
+        ]
+
+    def tearDown(self):
+        if hasattr(self, 'db'):
+            del self.db
+        if os.path.exists(self.test_db_path):
+            try:
+                os.remove(self.test_db_path)
+            except:
+                pass
+
+    def test_price_distribution_fences_and_histogram(self):
+        stats = price_distribution([1000, 1100, 1200, 1250, 1300, 1400, 9000],
+                                   reference=5000, bins=4)
+        self.assertEqual(stats["count"], 7)
+        self.assertEqual(stats["median"], 1250)
+        self.assertAlmostEqual(stats["p25"], 1150)
+        self.assertAlmostEqual(stats["p75"], 1350)
+        self.assertAlmostEqual(stats["upper_fence"], 1650)
+        self.assertEqual(stats["outliers_high"], 1)
+        self.assertEqual(stats["outliers"], [9000])
+        self.assertEqual(sum(stats["histogram"]["counts"]), 7)
+        self.assertEqual(stats["histogram"]["counts"][-1], 1)
+        self.assertEqual(stats["reference_flag"], "high")
+
+        single = price_distribution([500, 500])
+        self.assertEqual(single["histogram"]["counts"], [2])
+
+    def test_bulk_matches_per_line_statistics(self):
+        results = self.db.get_price_distributions(
+            "thuoc_generic", self.plan, [1200, None, None, None]
+        )
+        self.assertEqual([r["count"] for r in results], [7, 1, 0, 0])
+        expected = self.db.get_price_statistics("thuoc_generic", self.plan[0])
+        self.assertEqual(results[0]["min"], expected["min"])
+        self.assertEqual(results[0]["max"], expected["max"])
+        # Dòng không có giá bị bỏ qua (không tính là giá 0)
+        self.assertEqual(results[1]["min"], 3500)
+        self.assertEqual(results[0]["reference_flag"], "normal")
+        self.assertAlmostEqual(results[0]["reference_percentile"], 300 / 7)
+
+    @unittest.skipUnless(AnalyticsEngine.available(), "NumPy chưa được cài")
+    def test_engine_and_sql_paths_agree(self):
+        engine_results = self.db.get_price_distributions("thuoc_generic", self.plan)
+        sql_results = [
+            price_distribution(prices) for prices in self.db._prices_by_key_sql(
+                "thuoc_generic", ("nong_do_ham_luong", "ten_hoat_chat"),
+                [("500mg", "paracetamol"), ("250mg", "amoxicillin")]
+            )
+        ]
+        self.assertEqual(engine_results[0], sql_results[0])
+        self.assertEqual(sql_results[1]["count"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+import unittest
+import os
+import sys
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import DatabaseManager, rollup_period
+
+
+def _row(name, price, date, qty="10"):
+    row = [""] * 23
+    row[2], row[12], row[13], row[20] = name, qty, price, date
+    return tuple(row)
+
+
+class TestPriceTrend(unittest.TestCase):
+    def setUp(self):
+        self.test_db_path = "test_price_trend.db"
+        if os.path.exists(self.test_db_path):
+            os.remove(self.test_db_path)
+
+        self.db = DatabaseManager(self.test_db_path)
+        self.db.replace_all_data("thuoc_generic", [
+            _row("Paracetamol", "1.000", "05/01/2024"),
+            _row("paracetamol ", "3.000", "20/01/2024", "30"),
+            _row("Paracetamol", "2.000", "15/02/2024"),
+            _row("Paracetamol", "5.000", "01/04/2024"),
+            _row("Paracetamol", "", "01/04/2024"),
+            _row("Paracetamol", "9.000", "không rõ"),
+            _row("Amoxicillin", "700", "01/01/2024"),
+        ])
+
+    def tearDown(self):
+        if hasattr(self, 'db'):
+            del self.db
+        if os.path.exists(self.test_db_path):
+            try:
+                os.remove(self.test_db_path)
+            except:
+                pass
+
+    def test_rollup_period(self):
+        self.assertEqual(rollup_period("15/11/2023", "month"), "2023-11")
+        self.assertEqual(rollup_period("15/11/2023", "quarter"), "2023-Q4")
+        self.assertEqual(rollup_period("2024-02-01", "quarter"), "2024-Q1")
+        self.assertIsNone(rollup_period("", "month"))
+        self.assertIsNone(rollup_period("01/13/2024", "month"))
+
+    def test_month_and_quarter_rollups(self):
+        months = self.db.get_price_trend("thuoc_generic", "PARACETAMOL", "month")
+        self.assertEqual([m["period"] for m in months], ["2024-01", "2024-02", "2024-04"])
+        january = months[0]
+        self.assertEqual((january["count"], january["min"], january["max"]), (2, 1000, 3000))
+        self.assertEqual(january["median"], 2000)
+        self.assertEqual(january["volume"], 40)
+
+        quarters = self.db.get_price_trend("thuoc_generic", "paracetamol", "quarter")
+        self.assertEqual([(q["period"], q["count"]) for q in quarters],
+                         [("2024-Q1", 3), ("2024-Q2", 1)])
+        self.assertEqual(quarters[0]["median"], 2000)
+
+        ranged = self.db.get_price_trend("thuoc_generic", "paracetamol", "month",
+                                         start="01/02/2024", end="2024-03")
+        self.assertEqual([m["period"] for m in ranged], ["2024-02"])
+
+    def test_rollups_follow_ingest(self):
+        self.assertEqual(self.db.search_trend_drugs("thuoc_generic", "amox")[0][1], "Amoxicillin")
+        self.db.replace_all_data("thuoc_generic", [_row("Amoxicillin", "800", "01/03/2024")])
+        self.assertEqual(self.db.get_price_trend("thuoc_generic", "paracetamol"), [])
+        trend = self.db.get_price_trend("thuoc_generic", "amoxicillin", "quarter")
+        self.assertEqual([(q["period"], q["min"]) for q in trend], [("2024-Q1", 800)])
+
+        self.db.delete_all_data("thuoc_generic")
+        self.assertEqual(self.db.search_trend_drugs("thuoc_generic", ""), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
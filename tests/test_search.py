@@ -0,0 +1,157 @@
+import unittest
+import os
+import sys
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import DatabaseManager
+from normalizer import fold_text
+
+
+class TestSearch(unittest.TestCase):
+    def setUp(self):
+        self.test_db_path = "test_search.db"
+        if os.path.exists(self.test_db_path):
+            os.remove(self.test_db_path)
+
+        self.db = DatabaseManager(self.test_db_path)
+
+        conn = self.db._get_connection()
+        sql = """
+        INSERT INTO thuoc_generic (stt, ten_thuoc, ten_hoat_chat, dang_bao_che, don_gia, ngay_ban_hanh)
+        VALUES (?, ?, ?, ?, ?, ?)
+        """
+        conn.execute(sql, ("1", "Paracetamol 500", "Paracetamol", "Viên nén", "1.000", "15/03/2024"))
+        conn.execute(sql, ("2", "Efferalgan", "Paracetamol", "Viên sủi", "200", "01/06/2023"))
+        conn.execute(sql, ("10", "Đại tràng hoàn", "Mộc hương", "Hoàn cứng", "35.000", "20/12/2024"))
+        conn.commit()
+        conn.close()
+
+    def tearDown(self):
+        if hasattr(self, 'db'):
+            del self.db
+        if os.path.exists(self.test_db_path):
+            try:
+                os.remove(self.test_db_path)
+            except:
+                pass
+
+    def test_fold_text(self):
+        self.assertEqual(fold_text("Viên nén"), "viennen")
+        self.assertEqual(fold_text("Đại tràng"), "daitrang")
+        self.assertEqual(fold_text(None), "")
+
+    def test_unaccent_keyword(self):
+        rows = self.db.search_data("thuoc_generic", "paracetamol vien nen", search_mode="unaccent")
+        self.assertEqual(len(rows), 0)  # no single column holds both words
+
+        rows = self.db.search_data("thuoc_generic", "vien nen", search_mode="unaccent")
+        self.assertEqual([r[2] for r in rows], ["Paracetamol 500"])
+
+        # Accent-sensitive mode keeps the old behaviour
+        rows = self.db.search_data("thuoc_generic", "vien nen", search_mode="contains")
+        self.assertEqual(len(rows), 0)
+
+    def test_unaccent_column_and_filters(self):
+        count = self.db.count_search_data(
+            "thuoc_generic", "dai trang", search_column="ten_thuoc", search_mode="unaccent"
+        )
+        self.assertEqual(count, 1)
+
+        count = self.db.count_search_data(
+            "thuoc_generic", "", filters=[("dang_bao_che", "vien")], search_mode="unaccent"
+        )
+        self.assertEqual(count, 2)
+
+        # Short keyword (< 3 chars) falls back to LIKE on every folded column
+        count = self.db.count_search_data("thuoc_generic", "đa", search_mode="unaccent")
+        self.assertEqual(count, 1)
+
+    def test_index_follows_updates(self):
+        conn = self.db._get_connection()
+        conn.execute("UPDATE thuoc_generic SET dang_bao_che = 'Viên nang' WHERE stt = '1'")
+        conn.commit()
+        conn.close()
+        self.assertEqual(self.db.count_search_data("thuoc_generic", "vien nang", search_mode="unaccent"), 1)
+
+        self.db.delete_all_data("thuoc_generic")
+        self.assertEqual(self.db.count_search_data("thuoc_generic", "vien", search_mode="unaccent"), 0)
+
+    def test_fuzzy_ranked(self):
+        self.db.replace_all_data("thuoc_generic", [
+            ("1", "Amoxicillin 500mg", "Amoxicillin") + ("",) * 20,
+            ("2", "Augmentin", "Amoxicillin + Acid clavulanic") + ("",) * 20,
+            ("3", "Ampicilin", "Ampicilin") + ("",) * 20,
+            ("4", "Panadol", "Paracetamol") + ("",) * 20,
+        ])
+
+        rows = self.db.search_data("thuoc_generic", "Amoxicilin", search_mode="fuzzy")
+        names = [r[3] for r in rows]
+        self.assertEqual(names[0], "Amoxicillin")
+        self.assertIn("Amoxicillin + Acid clavulanic", names)
+        self.assertNotIn("Paracetamol", names)
+        self.assertEqual(
+            self.db.count_search_data("thuoc_generic", "Amoxicilin", search_mode="fuzzy"),
+            len(rows)
+        )
+
+        # A stricter threshold drops the weaker matches
+        self.db.fuzzy_threshold = 0.95
+        self.assertEqual(
+            self.db.count_search_data("thuoc_generic", "Amoxicilin", search_mode="fuzzy"), 0
+        )
+
+    def test_fuzzy_index_follows_replace(self):
+        self.db.replace_all_data("thuoc_generic", [("1", "Cefuroxim", "Cefuroxim") + ("",) * 20])
+        self.assertEqual(self.db.count_search_data("thuoc_generic", "cefuroxime", search_mode="fuzzy"), 1)
+        self.db.replace_all_data("thuoc_generic", [("1", "Ceftriaxon", "Ceftriaxon") + ("",) * 20])
+        self.assertEqual(self.db.count_search_data("thuoc_generic", "cefuroxime", search_mode="fuzzy"), 0)
+        conn = self.db._get_connection()
+        terms = conn.execute("SELECT COUNT(*) FROM fuzzy_terms WHERE table_name = 'thuoc_generic'").fetchone()[0]
+        conn.close()
+        self.assertEqual(terms, 2)
+
+    def test_numeric_and_date_sort(self):
+        rows = self.db.search_data("thuoc_generic", "", sort_column="don_gia", sort_order="ASC")
+        self.assertEqual([r[14] for r in rows], ["200", "1.000", "35.000"])
+
+        rows = self.db.search_data("thuoc_generic", "", sort_column="stt", sort_order="DESC")
+        self.assertEqual([r[1] for r in rows], ["10", "2", "1"])
+
+        rows = self.db.search_data("thuoc_generic", "", sort_column="ngay_ban_hanh")
+        self.assertEqual([r[21] for r in rows], ["01/06/2023", "15/03/2024", "20/12/2024"])
+
+        count = self.db.count_search_data("thuoc_generic", "", date_filters={
+            'column': 'ngay_ban_hanh', 'start': '01/01/2024', 'end': '31/12/2024'
+        })
+        self.assertEqual(count, 2)
+
+    def test_sorted_page_uses_index(self):
+        conn = self.db._get_connection()
+        for key in ("don_gia_num", "ten_thuoc", "ngay_ban_hanh_iso"):
+            plan = conn.execute(
+                f"EXPLAIN QUERY PLAN SELECT * FROM thuoc_generic "
+                f"ORDER BY {key} DESC, id DESC LIMIT 50"
+            ).fetchall()
+            detail = " ".join(row[3] for row in plan)
+            self.assertIn("USING INDEX", detail)
+            self.assertNotIn("TEMP B-TREE", detail)
+        conn.close()
+
+    def test_profiler_captures_slow_plan(self):
+        self.db.profiler.slow_ms = 0  # every call counts as slow
+        self.db.search_data("thuoc_generic", "vien", search_mode="unaccent", limit=50)
+        self.db.count_search_data("thuoc_generic", "vien", search_mode="unaccent")
+        self.db.get_distinct_values("thuoc_generic", "dang_bao_che")
+
+        shapes = {item["shape"]: item for item in self.db.profiler.stats()}
+        self.assertIn("search_data thuoc_generic unaccent kw=all", shapes)
+        self.assertIn("count_search_data thuoc_generic unaccent kw=all", shapes)
+        slow = self.db.profiler.slow_queries()
+        self.assertEqual(len(slow), 3)
+        self.assertTrue(any("thuoc_generic_fts" in line for line in slow[-1]["plan"]))
+
+
+if __name__ == '__main__':
+    unittest.main()
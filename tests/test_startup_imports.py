@@ -0,0 +1,26 @@
+import unittest
+import os
+import sys
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.bench_startup import measure, CORE_STARTUP_MODULES
+
+
+class TestStartupImports(unittest.TestCase):
+    def test_core_modules_skip_heavy_libraries(self):
+        report = measure(CORE_STARTUP_MODULES)
+        self.assertEqual(report["heavy_imported"], [])
+        self.assertGreater(report["module_count"], 0)
+
+    def test_preload_starts_once(self):
+        from lazy_imports import preload_in_background
+        thread = preload_in_background(["json"])
+        thread.join(timeout=30)
+        self.assertFalse(thread.is_alive())
+        self.assertIs(preload_in_background(), thread)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -41,6 +41,8 @@ DARK_THEME = {
     "card_mean_start": "#fa709a",  "card_mean_end": "#fee140",
     "card_median_start": "#667eea","card_median_end": "#764ba2",
     "card_max_start": "#ff0844",   "card_max_end": "#ffb199",
+    "card_weighted_start": "#11998e", "card_weighted_end": "#38ef7d",
+    "card_volume_start": "#606c88", "card_volume_end": "#3f4c6b",
 }
 
 LIGHT_THEME = {
@@ -82,4 +84,6 @@ LIGHT_THEME = {
     "card_mean_start": "#f1c40f",  "card_mean_end": "#f39c12",
     "card_median_start": "#9b59b6","card_median_end": "#8e44ad",
     "card_max_start": "#e74c3c",   "card_max_end": "#c0392b",
+    "card_weighted_start": "#16a085", "card_weighted_end": "#138d75",
+    "card_volume_start": "#5d6d7e", "card_volume_end": "#34495e",
 }
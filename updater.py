@@ -2,7 +2,6 @@
 import os
 import sys
 import webbrowser
-import requests
 import subprocess
 import tempfile
 from PyQt6.QtWidgets import (
@@ -20,6 +19,8 @@ class UpdateWorker(QThread):
         self.version_url = version_url
 
     def run(self):
+        import requests  # chỉ cần khi kiểm tra cập nhật (chạy nền)
+
         try:
             response = requests.get(self.version_url, timeout=5)
             if response.status_code == 200:
@@ -43,6 +44,8 @@ class DownloadWorker(QThread):
         self._is_cancelled = True
 
     def run(self):
+        import requests
+
         try:
             response = requests.get(self.url, stream=True, timeout=10)
             response.raise_for_status()